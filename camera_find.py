@@ -1,9 +1,10 @@
-import cv2
+import os
+import sys
 
-camera_list = []
-for i in range(10):  # 假设最多有10个摄像头
-    cap = cv2.VideoCapture(i)
-    if cap.isOpened():
-        camera_list.append(i)  # 添加可用摄像头的索引
-        cap.release()  # 释放摄像头
+# 探测逻辑在 game/camera_find.py 中，供 HandBind 和 Game 复用
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "game"))
+
+from camera_find import find_cameras  # noqa: E402
+
+camera_list = [camera["index"] for camera in find_cameras(use_cache=False)]
 print("可用摄像头ID:", camera_list)
@@ -0,0 +1,121 @@
+"""在同一段录制的视频上对比各推理后端
+
+用法：python bench_backends.py 视频或图片目录 [--model hand_landmarker.task]
+      [--frames 300] [--fast] [--roi] [--max-hands 1]
+
+默认按视频自身帧率实时送帧，这样 LIVE_STREAM 模式下的丢帧和结果延迟与实际
+使用时一致；--fast 时尽可能快地送帧，只比较单帧开销。以第一个后端的关键点为
+参照，统计其余后端的平均像素偏差。--roi 时加测只对上一帧手部区域推理的
+roi_tracking 模式。
+"""
+
+import argparse
+import os
+import time
+
+import numpy as np
+
+import hand as hd
+from hand_tasks import DEFAULT_MODEL_PATH
+from sources import open_source
+from stats import format_stats
+
+BACKENDS = [
+    ("solutions c0", {"backend": "solutions", "model_complexity": 0}),
+    ("solutions c1", {"backend": "solutions", "model_complexity": 1}),
+    ("tasks", {"backend": "tasks"}),
+]
+ROI_BACKENDS = [
+    ("c1 roi", {"backend": "solutions", "model_complexity": 1, "roi_tracking": True}),
+]
+
+
+def run_backend(
+    path: str, options: dict, frames: int, realtime: bool, max_hands: int = 1
+) -> dict:
+    hand = hd.HandBind(
+        source=open_source(path, realtime=realtime),
+        landmark_format="numpy",
+        max_hands=max_hands,
+        profile=True,
+        reuse_buffers=True,
+        **options,
+    )
+    points = []
+    ages = []
+    start = time.perf_counter()
+    try:
+        for _ in range(frames):
+            success, _, landmarks = hand.process_frame()
+            if not success:
+                break
+            points.append(landmarks[0, :, :2].astype(np.float32) if len(landmarks) else None)
+            if hand.landmarker is not None:
+                ages.append(hand.result_age)
+        elapsed = time.perf_counter() - start
+        stats = hand.get_stats()
+    finally:
+        hand.release()
+
+    detected = sum(p is not None for p in points)
+    return {
+        "frames": len(points),
+        "fps": len(points) / elapsed if elapsed > 0 else 0.0,
+        "detected": detected / len(points) if points else 0.0,
+        "result_age": float(np.mean(ages)) * 1000 if ages else 0.0,
+        "points": points,
+        "stats": stats,
+    }
+
+
+def mean_offset(reference, points) -> float:
+    """两组结果都检测到手的帧上，关键点的平均像素距离"""
+    distances = [
+        float(np.linalg.norm(a - b, axis=1).mean())
+        for a, b in zip(reference, points)
+        if a is not None and b is not None
+    ]
+    return float(np.mean(distances)) if distances else float("nan")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="对比 MediaPipe 推理后端")
+    parser.add_argument("source", help="视频文件或图片目录")
+    parser.add_argument("--model", default=DEFAULT_MODEL_PATH, help="HandLandmarker 模型")
+    parser.add_argument("--frames", type=int, default=300)
+    parser.add_argument("--fast", action="store_true", help="不按视频帧率送帧")
+    parser.add_argument("--roi", action="store_true", help="加测 roi_tracking 模式")
+    parser.add_argument("--max-hands", type=int, default=1)
+    args = parser.parse_args()
+
+    results = {}
+    for name, options in BACKENDS + (ROI_BACKENDS if args.roi else []):
+        if options["backend"] == "tasks":
+            if not os.path.isfile(args.model):
+                print(f"跳过 {name}：找不到模型 {args.model}")
+                continue
+            options = dict(options, model_path=args.model)
+        print(f"运行 {name} ...")
+        results[name] = run_backend(
+            args.source, options, args.frames, not args.fast, args.max_hands
+        )
+
+    if not results:
+        return
+
+    reference_name = next(iter(results))
+    reference = results[reference_name]["points"]
+    print(f"\n{'后端':<12}{'帧数':>6}{'帧率':>8}{'检出率':>7}{'结果延迟':>9}{'偏差':>8}")
+    for name, r in results.items():
+        offset = 0.0 if name == reference_name else mean_offset(reference, r["points"])
+        print(
+            f"{name:<14}{r['frames']:>8}{r['fps']:>10.1f}{r['detected']:>10.0%}"
+            f"{r['result_age']:>11.1f}ms{offset:>8.1f}px"
+        )
+    for name, r in results.items():
+        print(f"\n[{name}]")
+        print(format_stats(r["stats"]))
+
+
+if __name__ == "__main__":
+    main()
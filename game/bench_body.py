@@ -0,0 +1,112 @@
+"""对比蛇身用列表和用 SnakeBody 保存时每帧的耗时
+
+用法：python bench_body.py [--sizes 100 300 1000 3000] [--frames 200]
+
+每帧做一次完整的游戏步骤：蛇头前进一格、尾部缩短、自碰撞检测、绘制整个
+画面。“列表”是改用 SnakeBody 之前的写法：蛇身是 list，insert(0) / pop()，
+逐条线段调用 pg.draw.line。另外检查两种写法画出的画面是否逐像素相同。
+"""
+
+import argparse
+import os
+import random
+import time
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+import pygame as pg  # noqa: E402
+
+from bench_collision import serpentine  # noqa: E402
+from snake import SnakeGame  # noqa: E402
+
+WIDTH, HEIGHT = 1280, 720
+
+
+class ListBody(list):
+    """用列表保存蛇身，接口与 SnakeBody 相同"""
+
+    def reset(self, positions=()):
+        self[:] = list(positions)
+
+    def push_head(self, pos):
+        self.insert(0, pos)
+
+    def pop_tail(self):
+        self.pop()
+
+    def tolist(self):
+        return list(self)
+
+
+class ListSnakeGame(SnakeGame):
+    """改用 SnakeBody 之前的蛇身存储和绘制方式"""
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.snake_pos = ListBody(self.snake_pos.tolist())
+
+    def draw_snake(self, screen):
+        if len(self.snake_pos) > 1:
+            for i in range(len(self.snake_pos) - 1):
+                start_pos = self.snake_pos[i]
+                end_pos = self.snake_pos[i + 1]
+
+                color_ratio = i / len(self.snake_pos)
+                color = (0, int(200 * (1 - color_ratio)), 0)
+
+                line_width = max(6, int(12 * self.scale_factor))
+                pg.draw.line(screen, color, start_pos, end_pos, line_width)
+
+        if self.snake_pos:
+            head_pos = self.snake_pos[0]
+            head_radius = max(8, int(12 * self.scale_factor))
+            pg.draw.circle(screen, (0, 255, 0), head_pos, head_radius)
+            pg.draw.circle(screen, (255, 255, 255), head_pos, head_radius, 2)
+
+
+def make_game(cls, size, frames):
+    """蛇身沿蛇形路径排列，返回游戏和之后每帧的新蛇头"""
+    random.seed(0)  # 两种写法的食物和障碍物位置相同
+    game = cls(width=WIDTH, height=HEIGHT, start_questions=False)
+    path = serpentine(size + frames, step=8, width=WIDTH - 100)
+    game.set_snake(path[frames:])
+    game.snake_length = size
+    return game, path[:frames][::-1]
+
+
+def run(game, heads, screen) -> float:
+    start = time.perf_counter()
+    for head in heads:
+        game.update_snake_position(head)
+        game.check_self_collision(head)
+        screen.fill((0, 0, 0))
+        game.draw(screen, head)
+    return (time.perf_counter() - start) / len(heads)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="对比蛇身存储方式的每帧耗时")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 300, 1000, 3000])
+    parser.add_argument("--frames", type=int, default=200)
+    args = parser.parse_args()
+
+    pg.init()
+    screen = pg.Surface((WIDTH, HEIGHT))
+    print(f"{'节点数':>8}{'列表':>12}{'SnakeBody':>14}{'加速':>8}{'不同像素':>10}")
+    for size in args.sizes:
+        timings = []
+        images = []
+        for cls in (ListSnakeGame, SnakeGame):
+            game, heads = make_game(cls, size, args.frames)
+            timings.append(run(game, heads, screen))
+            images.append(pg.surfarray.array3d(screen))
+        different = int((images[0] != images[1]).any(axis=2).sum())
+        old, new = timings
+        print(
+            f"{size:>10}{old * 1e3:>12.2f}ms{new * 1e3:>12.2f}ms"
+            f"{old / new:>9.1f}x{different:>10}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+"""对比蛇身自碰撞检测的几种实现
+
+用法：python bench_collision.py [--sizes 10 100 1000 10000] [--repeat 200]
+
+蛇身按蛇形来回排列，相邻两行间距大于碰撞阈值，蛇头放在路径的下一个点上，
+因此不会提前命中，每种实现都要检查完整条蛇身，得到的是最坏情况的耗时。
+另外在随机位置上比较各实现的结果，确认规则一致。
+"""
+
+import argparse
+import os
+import random
+import time
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+from snake import SnakeGame  # noqa: E402
+
+IMPLEMENTATIONS = [
+    ("逐个检查", "check_self_collision_scalar"),
+    ("NumPy", "check_self_collision_numpy"),
+    ("空间网格", "check_self_collision"),
+]
+
+
+def serpentine(count: int, step: float = 8.0, row_gap: float = 24.0, width=2000):
+    """count 个节点的蛇形路径，从蛇头到蛇尾"""
+    per_row = int(width // step)
+    points = []
+    for i in range(count):
+        row, col = divmod(i, per_row)
+        if row % 2:
+            col = per_row - 1 - col
+        points.append((50 + col * step, 50 + row * row_gap))
+    points.reverse()
+    return points
+
+
+def time_call(func, head, repeat: int) -> float:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        func(head)
+    return (time.perf_counter() - start) / repeat
+
+
+def check_agreement(game, methods, trials: int = 500) -> int:
+    """随机蛇头位置上各实现结果不一致的次数"""
+    body = game.snake_pos.tolist()
+    mismatches = 0
+    for _ in range(trials):
+        x, y = random.choice(body)
+        head = (x + random.uniform(-15, 15), y + random.uniform(-15, 15))
+        results = {method(head) for method in methods}
+        mismatches += len(results) > 1
+    return mismatches
+
+
+def main():
+    parser = argparse.ArgumentParser(description="对比自碰撞检测的实现")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 100, 1000, 10000])
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+
+    game = SnakeGame(start_questions=False)
+    header = "".join(f"{name:>12}" for name, _ in IMPLEMENTATIONS)
+    print(f"{'线段数':>8}{header}{'不一致':>8}")
+    for size in args.sizes:
+        # 线段 1 .. n - 4 参与检测，n 个节点有 n - 4 条
+        body = serpentine(size + 4)
+        head = body[0]
+        game.set_snake(body[1:])
+        methods = [getattr(game, attr) for _, attr in IMPLEMENTATIONS]
+
+        # 逐个检查在长蛇身上很慢，按长度减少重复次数
+        timings = []
+        for method in methods:
+            repeat = max(3, args.repeat * 100 // max(size, 100))
+            timings.append(time_call(method, head, repeat))
+        mismatches = check_agreement(game, methods)
+
+        cells = "".join(f"{t * 1e6:>10.1f}us" for t in timings)
+        print(f"{size:>10}{cells}{mismatches:>9}")
+
+
+if __name__ == "__main__":
+    main()
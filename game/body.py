@@ -0,0 +1,88 @@
+"""蛇身坐标的环形缓冲区"""
+
+import numpy as np
+
+
+class SnakeBody:
+    """用 NumPy 环形缓冲区保存蛇身 (x, y)，下标 0 是蛇头
+
+    蛇头前进时 push_head() 只写一行，尾部缩短时 pop_tail() 只改长度，都是
+    O(1)。存储有 2 × capacity 行，每个节点同时写在 i 和 i + capacity 两处，
+    所以从蛇头到蛇尾总是一段连续的内存，array 可以直接返回视图。长度超过
+    capacity 时容量翻倍（摊还 O(1)）。
+
+    取单个节点返回元组，len()、迭代、切片和 tolist() 与原来的列表用法一致。
+    逐个下标访问比列表慢，需要遍历整条蛇身时先调用一次 tolist()。
+    """
+
+    def __init__(self, positions=(), capacity: int = 256, dtype=np.float64):
+        self.dtype = np.dtype(dtype)
+        self.capacity = max(1, capacity)
+        self._data = np.empty((2 * self.capacity, 2), self.dtype)
+        self._start = 0  # 蛇头所在行（0 <= _start < capacity）
+        self._length = 0
+        self.reset(positions)
+
+    def reset(self, positions=()) -> None:
+        """positions 从蛇头到蛇尾"""
+        positions = list(positions)
+        self._length = 0
+        self._start = 0
+        if len(positions) > self.capacity:
+            self._grow(len(positions))
+        for pos in reversed(positions):
+            self.push_head(pos)
+
+    def _grow(self, needed: int) -> None:
+        array = self.array.copy()
+        while self.capacity < needed:
+            self.capacity *= 2
+        self._data = np.empty((2 * self.capacity, 2), self.dtype)
+        self._start = 0
+        self._data[: len(array)] = array
+        self._data[self.capacity : self.capacity + len(array)] = array
+
+    def push_head(self, pos) -> None:
+        if self._length == self.capacity:
+            self._grow(self.capacity + 1)
+        start = (self._start - 1) % self.capacity
+        mirror = start + self.capacity
+        # 逐个标量写入比整行赋值元组快一倍
+        data = self._data
+        data[start, 0] = data[mirror, 0] = pos[0]
+        data[start, 1] = data[mirror, 1] = pos[1]
+        self._start = start
+        self._length += 1
+
+    def pop_tail(self) -> None:
+        if self._length:
+            self._length -= 1
+
+    def trim(self, length: int) -> None:
+        """只保留靠近蛇头的 length 个节点"""
+        self._length = max(0, min(self._length, length))
+
+    @property
+    def array(self) -> np.ndarray:
+        """从蛇头到蛇尾的 (n, 2) 连续视图，下一次修改前有效"""
+        return self._data[self._start : self._start + self._length]
+
+    def __len__(self) -> int:
+        return self._length
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [tuple(row) for row in self.array[index].tolist()]
+        if index < 0:
+            index += self._length
+        if not 0 <= index < self._length:
+            raise IndexError("蛇身下标越界")
+        row = self._start + index
+        return (self._data.item(row, 0), self._data.item(row, 1))
+
+    def __iter__(self):
+        return iter(self.tolist())
+
+    def tolist(self) -> list:
+        """转换成元组列表，可直接保存为 JSON 等格式"""
+        return [tuple(row) for row in self.array.tolist()]
@@ -0,0 +1,33 @@
+"""逐帧转换用的预分配缓冲区"""
+
+import numpy as np
+
+
+class BufferPool:
+    """按名字复用缓冲区，只有需要更大的空间或类型变化时才重新分配
+
+    每个名字背后是一块一维存储，get() 返回其前部的连续视图，因此同一个名字
+    用不同形状（例如大小变化的 ROI 裁剪）也不会重新分配。misses 只记录本池
+    为此新建存储的次数，用来确认这些缓冲区在预热后不再重建（mark() /
+    misses_since_mark()）；池外的临时数组不在统计之内。
+    """
+
+    def __init__(self):
+        self._storage: dict[str, np.ndarray] = {}
+        self.misses = 0
+        self._mark = 0
+
+    def get(self, name: str, shape, dtype=np.uint8) -> np.ndarray:
+        shape = tuple(shape)
+        size = int(np.prod(shape))
+        storage = self._storage.get(name)
+        if storage is None or storage.size < size or storage.dtype != dtype:
+            storage = self._storage[name] = np.empty(size, dtype)
+            self.misses += 1
+        return storage[:size].reshape(shape)
+
+    def mark(self) -> None:
+        self._mark = self.misses
+
+    def misses_since_mark(self) -> int:
+        return self.misses - self._mark
@@ -0,0 +1,266 @@
+"""启动校准：在本机上试跑候选视觉参数，挑出达标的最快配置并按机器保存
+
+候选覆盖采集分辨率、inference_scale 和 model_complexity。每个候选在摄像头或
+录制的视频上跑几秒，测量帧率和关键点稳定性（手保持不动时关键点逐帧抖动的
+幅度，按手的大小归一化）。
+
+比摄像头快的候选测出的帧率都约等于摄像头的帧率，比较帧率分不出快慢，
+所以另外记录每帧的处理耗时（profile 统计的 total p50）。达到目标帧率和
+稳定性的候选中选耗时最少的一个，都不达标时才退回帧率最高的一个。
+
+用法：python calibration.py [视频文件] [--target-fps 25] [--seconds 2]
+"""
+
+import argparse
+import itertools
+import json
+import math
+import os
+import platform
+import time
+
+import numpy as np
+
+PROFILE_PATH = os.path.join(
+    os.path.expanduser("~"), ".cache", "game_python", "vision_profile.json"
+)
+
+RESOLUTIONS = [(1280, 720), (640, 480), (320, 240)]
+INFERENCE_SCALES = [1.0, 0.75, 0.5]
+MODEL_COMPLEXITIES = [1, 0]
+
+
+def machine_key() -> str:
+    """区分机器的标识：主机名、CPU 架构和核数"""
+    return f"{platform.node()}|{platform.machine()}|{os.cpu_count()}"
+
+
+def candidates(file_source: bool = False) -> list[dict]:
+    """候选配置；录制的视频分辨率固定，只组合 inference_scale 和模型复杂度"""
+    resolutions = [None] if file_source else RESOLUTIONS
+    result = []
+    for size, scale, complexity in itertools.product(
+        resolutions, INFERENCE_SCALES, MODEL_COMPLEXITIES
+    ):
+        config = {"inference_scale": scale, "model_complexity": complexity}
+        if size is not None:
+            config["capture_width"], config["capture_height"] = size
+        result.append(config)
+    return result
+
+
+def measure(config: dict, source=None, camera_id=0, seconds=2.0, warmup=0.5) -> dict:
+    """按 config 创建 HandBind 跑 seconds 秒，返回帧率、每帧耗时、检出率和抖动"""
+    import hand as hd
+    from sources import open_source
+
+    if isinstance(source, str):
+        source = open_source(source, realtime=True, loop=True)
+    hand = hd.HandBind(
+        camera_id=camera_id,
+        max_hands=1,
+        threaded_capture=True,
+        landmark_format="numpy",
+        source=source,
+        fourcc="MJPG" if source is None else None,
+        capture_buffer_size=1,
+        reuse_buffers=True,
+        profile=True,
+        **config,
+    )
+    try:
+        # 驱动不支持请求的分辨率时会换成别的，这种候选没有意义
+        if "capture_width" in config and (
+            hand.get_img_size() != (config["capture_width"], config["capture_height"])
+        ):
+            return {
+                "config": config,
+                "fps": 0.0,
+                "detected": 0.0,
+                "jitter": float("inf"),
+                "cost": float("inf"),
+                "unsupported": True,
+            }
+
+        start = time.perf_counter()
+        while time.perf_counter() - start < warmup:
+            hand.process_frame()
+        # 只统计正式测量期间新画面的处理耗时（重复的画面不经过计时）
+        hand.timer.reset()
+
+        frames = 0
+        detected = 0
+        jitters = []
+        previous = None
+        start = time.perf_counter()
+        while time.perf_counter() - start < seconds:
+            success, _, landmarks = hand.process_frame()
+            if not success:
+                break
+            if getattr(hand.cap, "last_reused", False):
+                # 没有新画面时返回的是上一帧的结果，计入会虚增帧率、压低抖动
+                continue
+            frames += 1
+            if not len(landmarks):
+                previous = None
+                continue
+            detected += 1
+            points = landmarks[0, :, :2].astype(np.float32)
+            if previous is not None:
+                size = np.linalg.norm(points.max(axis=0) - points.min(axis=0))
+                if size > 0:
+                    step = np.linalg.norm(points - previous, axis=1).mean()
+                    jitters.append(step / size)
+            previous = points
+        elapsed = time.perf_counter() - start
+        total = hand.get_stats().get("total")
+    finally:
+        hand.release()
+
+    return {
+        "config": config,
+        "fps": frames / elapsed if elapsed > 0 else 0.0,
+        "detected": detected / frames if frames else 0.0,
+        # 中位数不受偶尔的手部移动影响
+        "jitter": float(np.median(jitters)) if jitters else float("inf"),
+        # 每帧处理耗时的中位数（毫秒）
+        "cost": total["p50"] if total else float("inf"),
+    }
+
+
+def passes(result: dict, target_fps: float, max_jitter: float | None) -> bool:
+    return result["fps"] >= target_fps and (
+        max_jitter is None or result["jitter"] <= max_jitter
+    )
+
+
+def choose(
+    results: list[dict],
+    target_fps: float,
+    max_jitter: float | None,
+    min_detected: float = 0.0,
+) -> dict:
+    """达标候选中每帧耗时最少的；都不达标时退回帧率最高的一个
+
+    检出率低于 min_detected 的候选既不算达标，也不会被退回选中。
+    """
+    usable = [
+        r
+        for r in results
+        if not r.get("unsupported") and r["detected"] >= min_detected
+    ]
+    if not usable:
+        raise ValueError(f"没有检出率达到 {min_detected:.0%} 的候选配置")
+    passed = [r for r in usable if passes(r, target_fps, max_jitter)]
+    if passed:
+        return min(passed, key=lambda r: r["cost"])
+    return max(usable, key=lambda r: r["fps"])
+
+
+def calibrate(
+    source=None,
+    camera_id=0,
+    target_fps: float = 25.0,
+    max_jitter: float | None = 0.02,
+    seconds: float = 2.0,
+    configs=None,
+    verbose: bool = True,
+    min_detected: float = 0.5,
+) -> dict:
+    """逐个测量候选配置并返回选中的结果
+
+    max_jitter 为 None 时不检查稳定性和检出率（例如画面中没有手的录像）。
+    """
+    if max_jitter is None:
+        min_detected = 0.0
+    if configs is None:
+        configs = candidates(file_source=source is not None)
+    if verbose and max_jitter is not None:
+        print("校准中，请把一只手放在摄像头前保持不动...")
+
+    results = []
+    for config in configs:
+        result = measure(config, source, camera_id, seconds)
+        results.append(result)
+        if verbose:
+            if result.get("unsupported"):
+                print(f"{config}: 摄像头不支持该分辨率，跳过")
+            else:
+                print(
+                    f"{config}: {result['fps']:.1f} FPS, 每帧 {result['cost']:.1f} ms, "
+                    f"检出率 {result['detected']:.0%}, 抖动 {result['jitter']:.4f}"
+                )
+
+    best = choose(results, target_fps, max_jitter, min_detected)
+    passed = passes(best, target_fps, max_jitter)
+    if verbose:
+        status = "选定配置" if passed else "没有配置达标，改用帧率最高的配置"
+        print(f"{status}: {best['config']}")
+    return {
+        "config": best["config"],
+        "fps": best["fps"],
+        "cost_ms": best["cost"] if math.isfinite(best["cost"]) else None,
+        # inf 不是合法的 JSON，没检测到手时记为 null
+        "jitter": best["jitter"] if math.isfinite(best["jitter"]) else None,
+        "passed": passed,
+        "target_fps": target_fps,
+        "max_jitter": max_jitter,
+        "min_detected": min_detected,
+        "time": time.strftime("%Y-%m-%d %H:%M:%S"),
+    }
+
+
+def _load_profiles(path: str) -> dict:
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def save_profile(profile: dict, path: str = PROFILE_PATH) -> None:
+    profiles = _load_profiles(path)
+    profiles[machine_key()] = profile
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(profiles, f, ensure_ascii=False, indent=2)
+    except OSError as e:
+        print(f"保存校准结果失败: {e}")
+
+
+def load_profile(path: str = PROFILE_PATH) -> dict:
+    """返回本机保存的 HandBind 参数，没有校准过时返回空字典"""
+    profile = _load_profiles(path).get(machine_key())
+    return dict(profile["config"]) if profile else {}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="校准本机的视觉参数")
+    parser.add_argument("source", nargs="?", help="录制的视频，默认使用摄像头")
+    parser.add_argument("--camera", type=int, default=0)
+    parser.add_argument("--target-fps", type=float, default=25.0)
+    parser.add_argument("--max-jitter", type=float, default=0.02)
+    parser.add_argument("--no-stability", action="store_true", help="不检查稳定性")
+    parser.add_argument("--seconds", type=float, default=2.0)
+    parser.add_argument("--min-detected", type=float, default=0.5, help="最低检出率")
+    args = parser.parse_args()
+
+    try:
+        profile = calibrate(
+            source=args.source,
+            camera_id=args.camera,
+            target_fps=args.target_fps,
+            max_jitter=None if args.no_stability else args.max_jitter,
+            seconds=args.seconds,
+            min_detected=args.min_detected,
+        )
+    except ValueError as e:
+        print(f"校准失败，未保存: {e}")
+        return
+    save_profile(profile)
+    print(f"已保存到 {PROFILE_PATH}")
+
+
+if __name__ == "__main__":
+    main()
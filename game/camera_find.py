@@ -0,0 +1,113 @@
+"""并行探测可用摄像头，并按 /dev/video* 设备集合缓存结果"""
+
+import glob
+import json
+import os
+import re
+import threading
+import time
+
+import cv2
+
+CACHE_PATH = os.path.join(
+    os.path.expanduser("~"), ".cache", "game_python", "cameras.json"
+)
+
+
+def _device_key():
+    """当前 /dev/video* 设备集合的指纹，没有这类设备（非 Linux）时返回 None"""
+    devices = sorted(glob.glob("/dev/video*"))
+    if not devices:
+        return None
+    parts = []
+    for path in devices:
+        try:
+            st = os.stat(path)
+        except OSError:
+            continue
+        parts.append(f"{path}:{st.st_rdev}:{int(st.st_ctime)}")
+    return "|".join(parts)
+
+
+def _candidates(max_index: int) -> list[int]:
+    """Linux 下只探测实际存在的设备节点，其他系统按编号逐个尝试"""
+    indexes = []
+    for path in glob.glob("/dev/video*"):
+        match = re.fullmatch(r"/dev/video(\d+)", path)
+        if match:
+            indexes.append(int(match.group(1)))
+    return sorted(indexes) if indexes else list(range(max_index))
+
+
+def _probe(index: int, results: dict) -> None:
+    cap = cv2.VideoCapture(index)
+    try:
+        if cap.isOpened():
+            results[index] = {
+                "index": index,
+                "width": int(cap.get(cv2.CAP_PROP_FRAME_WIDTH)),
+                "height": int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT)),
+                "fps": cap.get(cv2.CAP_PROP_FPS),
+            }
+    finally:
+        cap.release()
+
+
+def _load_cache(path: str) -> dict:
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _save_cache(path: str, cache: dict) -> None:
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(cache, f, ensure_ascii=False, indent=2)
+    except OSError as e:
+        print(f"保存摄像头缓存失败: {e}")
+
+
+def find_cameras(
+    max_index: int = 10,
+    timeout: float = 3.0,
+    use_cache: bool = True,
+    cache_path: str = CACHE_PATH,
+) -> list[dict]:
+    """返回可用摄像头列表，每项包含 index、width、height、fps
+
+    所有候选设备同时探测，超过 timeout 秒没有响应的设备视为不可用。
+    设备集合没有变化时直接使用缓存的结果；有探测超时时不写缓存，下次重新探测。
+    """
+    key = _device_key() if use_cache else None
+    if key is not None:
+        cached = _load_cache(cache_path).get(key)
+        if cached is not None:
+            return cached
+
+    results = {}
+    threads = [
+        threading.Thread(target=_probe, args=(index, results), daemon=True)
+        for index in _candidates(max_index)
+    ]
+    for thread in threads:
+        thread.start()
+    deadline = time.monotonic() + timeout
+    for thread in threads:
+        thread.join(max(0.0, deadline - time.monotonic()))
+    timed_out = any(thread.is_alive() for thread in threads)
+
+    found = dict(results)  # 超时的探测线程仍可能在后台写入
+    cameras = [found[index] for index in sorted(found)]
+
+    if key is not None and not timed_out:
+        # 设备指纹包含创建时间，每次开机都会变，只保留当前这一条
+        _save_cache(cache_path, {key: cameras})
+    return cameras
+
+
+if __name__ == "__main__":
+    camera_list = [camera["index"] for camera in find_cameras(use_cache=False)]
+    print("可用摄像头ID:", camera_list)
@@ -0,0 +1,86 @@
+"""关键点平滑与延迟补偿
+
+OneEuroFilter 对整组关键点同时做 One Euro 滤波：静止时截止频率低、抖动小，
+移动快时截止频率随速度升高、滞后小。滤波同时得到的速度估计可以用来把关键点
+向前外推一小段时间，抵消摄像头和推理带来的延迟。
+"""
+
+import math
+
+import numpy as np
+
+
+def landmark_params(value, overrides=None) -> np.ndarray:
+    """生成每个关键点一个值的参数数组，overrides 为 {关键点编号: 值}"""
+    params = np.full((21, 1), value, np.float32)
+    for index, v in (overrides or {}).items():
+        params[index] = v
+    return params
+
+
+class OneEuroFilter:
+    """向量化的 One Euro 滤波器
+
+    输入为 (n_hands, 21, 3) 的数组；min_cutoff 和 beta 可以是标量，也可以是
+    landmark_params() 生成的 (21, 1) 数组，为每个关键点单独配置。
+    单位与输入一致（HandBind 中为归一化坐标，时间单位为秒）。
+    """
+
+    def __init__(self, min_cutoff=1.0, beta=8.0, d_cutoff: float = 1.0):
+        self.min_cutoff = np.asarray(min_cutoff, np.float32)
+        self.beta = np.asarray(beta, np.float32)
+        self.d_cutoff = d_cutoff
+        self.reset()
+
+    def reset(self) -> None:
+        self.x = None  # 上一次的滤波结果
+        self.dx = None  # 上一次的速度估计（单位/秒）
+        self.t = 0.0
+
+    @staticmethod
+    def _alpha(dt: float, cutoff):
+        tau = 1.0 / (2 * math.pi * cutoff)
+        return 1.0 / (1.0 + tau / dt)
+
+    def __call__(self, x, t: float):
+        if self.x is None or self.x.shape != x.shape:
+            self.x = np.array(x, np.float32)
+            self.dx = np.zeros_like(self.x)
+            # 逐帧计算用的临时数组，形状不变时一直复用
+            self._diff = np.empty_like(self.x)
+            self._gain = np.empty_like(self.x)
+            self.t = t
+            return self.x
+
+        dt = t - self.t
+        if dt <= 0:
+            return self.x
+        self.t = t
+
+        # 先对速度做低通，再由速度决定位置的截止频率
+        a_d = self._alpha(dt, self.d_cutoff)
+        diff = np.subtract(x, self.x, out=self._diff)
+        # self.dx += a_d * ((x - self.x) / dt - self.dx)
+        gain = np.multiply(diff, 1.0 / dt, out=self._gain)
+        gain -= self.dx
+        gain *= a_d
+        self.dx += gain
+
+        # a = 1 / (1 + tau / dt)，tau = 1 / (2π · cutoff)，即 1 - 1 / (r + 1)，
+        # 其中 r = 2π · cutoff · dt，cutoff = min_cutoff + beta · |dx|
+        gain = np.abs(self.dx, out=self._gain)
+        gain *= self.beta
+        gain += self.min_cutoff
+        gain *= 2 * math.pi * dt
+        gain += 1
+        np.reciprocal(gain, out=gain)
+        np.subtract(1, gain, out=gain)
+        diff *= gain
+        self.x += diff
+        return self.x
+
+    def predict(self, horizon: float, out=None):
+        """按当前速度把滤波结果外推 horizon 秒"""
+        out = np.multiply(self.dx, horizon, out=out)
+        out += self.x
+        return out
@@ -0,0 +1,202 @@
+"""每帧一次的手势识别：捏合、张开手掌、指向和挥动
+
+GestureEngine 在视觉层根据关键点数组统一计算手势，前端只需要读取事件，
+不用在每个界面里各自判断捏合。坐标与 HandBind 输出的像素坐标一致（未镜像）。
+"""
+
+import math
+from collections import deque
+from typing import NamedTuple
+
+import numpy as np
+
+THUMB_TIP, INDEX_TIP = 4, 8
+# 用切片表示，取出的是视图，不复制数据
+FINGER_TIPS = slice(8, 21, 4)  # 8, 12, 16, 20
+FINGER_PIPS = slice(6, 19, 4)  # 6, 10, 14, 18
+PALM_MCPS = slice(5, 18, 4)  # 掌心取手腕 0 和 5, 9, 13, 17 的平均
+
+
+class GestureEvent(NamedTuple):
+    kind: str  # pinch / pinch_release / open_palm / point / swipe_left ...
+    hand: int
+    position: tuple[int, int]  # 食指指尖（捏合、指向）或掌心（其他）
+    timestamp: float
+
+
+class GestureEngine:
+    """带迟滞和去抖的手势状态机
+
+    - 捏合：拇指与食指指尖距离低于 pinch_threshold 时进入，超过
+      pinch_threshold * release_ratio 才释放；进入时发出 pinch 事件（点击），
+      两次点击间隔不少于 click_cooldown 秒
+    - 张开手掌 / 指向：同一姿势连续 pose_frames 帧才确认，确认时发出一次事件
+    - 挥动：掌心在 swipe_window 秒内的平均速度超过 swipe_speed（像素/秒）
+    """
+
+    def __init__(
+        self,
+        max_hands: int = 2,
+        pinch_threshold: float = 20.0,
+        release_ratio: float = 1.5,
+        click_cooldown: float = 0.3,
+        pose_frames: int = 3,
+        swipe_speed: float = 1500.0,
+        swipe_window: float = 0.2,
+        swipe_cooldown: float = 0.6,
+    ):
+        self.max_hands = max_hands
+        self.pinch_threshold = pinch_threshold
+        self.release_ratio = release_ratio
+        self.click_cooldown = click_cooldown
+        self.pose_frames = pose_frames
+        self.swipe_speed = swipe_speed
+        self.swipe_window = swipe_window
+        self.swipe_cooldown = swipe_cooldown
+
+        self.pinching = [False] * max_hands
+        self.poses = [None] * max_hands
+        self._pose_candidate = [None] * max_hands
+        self._pose_count = [0] * max_hands
+        self._last_click = [-math.inf] * max_hands
+        self._last_swipe = [-math.inf] * max_hands
+        self._palm_history = [deque(maxlen=32) for _ in range(max_hands)]
+        self.events = deque(maxlen=256)
+
+        # 逐帧计算用的临时数组
+        self._pts = np.empty((max_hands, 21, 2), np.float32)
+        self._pinch = np.empty((max_hands, 2), np.float32)
+        self._pinch_dist = np.empty(max_hands, np.float32)
+        self._tips = np.empty((max_hands, 4, 2), np.float32)
+        self._tip_dist = np.empty((max_hands, 4), np.float32)
+        self._pip_dist = np.empty((max_hands, 4), np.float32)
+        self._extended = np.empty((max_hands, 4), bool)
+        self._palms = np.empty((max_hands, 2), np.float32)
+
+    def update(self, points, timestamp: float) -> list[GestureEvent]:
+        """输入 (n_hands, 21, >=2) 的像素坐标，返回本帧产生的事件"""
+        count = min(len(points), self.max_hands)
+        events = []
+
+        if count:
+            pts = self._pts[:count]
+            np.copyto(pts, points[:count, :, :2], casting="unsafe")
+            wrist = pts[:, :1]
+
+            pinch = np.subtract(
+                pts[:, INDEX_TIP], pts[:, THUMB_TIP], out=self._pinch[:count]
+            )
+            pinch *= pinch
+            pinch_dist = np.sum(pinch, axis=1, out=self._pinch_dist[:count])
+            np.sqrt(pinch_dist, out=pinch_dist)
+
+            # 比较平方距离：tip > pip * 1.15 等价于 tip² > pip² * 1.15²
+            tip_dist = self._squared_dist(pts[:, FINGER_TIPS], wrist, self._tip_dist)
+            pip_dist = self._squared_dist(pts[:, FINGER_PIPS], wrist, self._pip_dist)
+            pip_dist *= 1.15 * 1.15
+            extended = np.greater(tip_dist, pip_dist, out=self._extended[:count])
+
+            palms = np.sum(pts[:, PALM_MCPS], axis=1, out=self._palms[:count])
+            palms += pts[:, 0]
+            palms /= 5
+
+            extended = extended.tolist()
+            palms = palms.tolist()
+            pinch_dist = pinch_dist.tolist()
+            index_tips = [(int(x), int(y)) for x, y in pts[:, INDEX_TIP].tolist()]
+
+        for hand in range(self.max_hands):
+            if hand >= count:
+                self._lost(hand, timestamp, events)
+                continue
+
+            index_tip = index_tips[hand]
+            palm = (int(palms[hand][0]), int(palms[hand][1]))
+
+            self._update_pinch(hand, pinch_dist[hand], index_tip, timestamp, events)
+
+            fingers = extended[hand]
+            if all(fingers):
+                pose = "open_palm"
+            elif fingers[0] and not any(fingers[1:]):
+                pose = "point"
+            else:
+                pose = None
+            position = index_tip if pose == "point" else palm
+            self._update_pose(hand, pose, position, timestamp, events)
+
+            self._update_swipe(hand, palms[hand], timestamp, events)
+
+        self.events.extend(events)
+        return events
+
+    def _squared_dist(self, tips, wrist, out):
+        """每只手各指尖（或指节）到手腕的平方距离，写入 out"""
+        count = len(tips)
+        diff = np.subtract(tips, wrist, out=self._tips[:count])
+        diff *= diff
+        return np.sum(diff, axis=2, out=out[:count])
+
+    def _update_pinch(self, hand, dist, position, timestamp, events) -> None:
+        if self.pinching[hand]:
+            if dist > self.pinch_threshold * self.release_ratio:
+                self.pinching[hand] = False
+                events.append(GestureEvent("pinch_release", hand, position, timestamp))
+        elif dist < self.pinch_threshold:
+            self.pinching[hand] = True
+            if timestamp - self._last_click[hand] >= self.click_cooldown:
+                self._last_click[hand] = timestamp
+                events.append(GestureEvent("pinch", hand, position, timestamp))
+
+    def _update_pose(self, hand, pose, position, timestamp, events) -> None:
+        if pose != self._pose_candidate[hand]:
+            self._pose_candidate[hand] = pose
+            self._pose_count[hand] = 1
+        else:
+            self._pose_count[hand] += 1
+
+        if self._pose_count[hand] >= self.pose_frames and pose != self.poses[hand]:
+            self.poses[hand] = pose
+            if pose is not None:
+                events.append(GestureEvent(pose, hand, position, timestamp))
+
+    def _update_swipe(self, hand, palm, timestamp, events) -> None:
+        history = self._palm_history[hand]
+        history.append((timestamp, palm[0], palm[1]))
+        while len(history) > 1 and timestamp - history[0][0] > self.swipe_window:
+            history.popleft()
+
+        t0, x0, y0 = history[0]
+        dt = timestamp - t0
+        if dt <= 0 or timestamp - self._last_swipe[hand] < self.swipe_cooldown:
+            return
+
+        vx, vy = (palm[0] - x0) / dt, (palm[1] - y0) / dt
+        if max(abs(vx), abs(vy)) < self.swipe_speed:
+            return
+
+        if abs(vx) >= abs(vy):
+            kind = "swipe_right" if vx > 0 else "swipe_left"
+        else:
+            kind = "swipe_down" if vy > 0 else "swipe_up"
+        self._last_swipe[hand] = timestamp
+        history.clear()
+        events.append(
+            GestureEvent(kind, hand, (int(palm[0]), int(palm[1])), timestamp)
+        )
+
+    def _lost(self, hand, timestamp, events) -> None:
+        """手离开画面时结束所有进行中的手势"""
+        if self.pinching[hand]:
+            self.pinching[hand] = False
+            events.append(GestureEvent("pinch_release", hand, (0, 0), timestamp))
+        self.poses[hand] = None
+        self._pose_candidate[hand] = None
+        self._pose_count[hand] = 0
+        self._palm_history[hand].clear()
+
+    def drain(self) -> list[GestureEvent]:
+        """取出并清空累积的事件"""
+        events = list(self.events)
+        self.events.clear()
+        return events
@@ -1,9 +1,10 @@
-from openai import OpenAI
-
 __all__ = ["get_question", "convert"]
 
 
 def get_question() -> str:
+    # openai 导入较慢，只在真正请求题目时才导入
+    from openai import OpenAI
+
     client = OpenAI(
         api_key="",
         base_url="https://api.deepseek.com/v1",
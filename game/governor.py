@@ -0,0 +1,130 @@
+"""根据滚动帧时间自动调整画质
+
+持续超出帧预算时按 STEPS 的顺序逐级降低画质：先关闭关键点绘制，再降低推理
+分辨率，然后跳帧推理，最后降低渲染帧率。余量恢复后再逐级升回。降级和升级
+用不同的阈值和等待时间，避免在两个等级之间来回切换。
+"""
+
+import time
+from collections import deque
+
+# 每一级在上一级的基础上再改一项：(属性, 值, 说明)
+STEPS = [
+    ("handdraw", False, "关闭关键点绘制"),
+    ("inference_scale", 0.75, "推理分辨率 75%"),
+    ("inference_scale", 0.5, "推理分辨率 50%"),
+    ("infer_every", 2, "每 2 帧推理一次"),
+    ("infer_every", 3, "每 3 帧推理一次"),
+    ("render_fps", 45, "渲染 45 FPS"),
+    ("render_fps", 30, "渲染 30 FPS"),
+]
+
+
+class QualityGovernor:
+    """画质调节器
+
+    每帧调用 record() 传入这一帧实际干活的时间（不含 clock.tick 的等待）。
+    窗口内的平均帧时间超过预算的 overload 倍且距上次调整至少 down_delay 秒时
+    降一级；低于上一级预算的 headroom 倍且至少 up_delay 秒时升一级。
+    hand 上不存在的属性（例如回放对象）会被跳过。
+    """
+
+    def __init__(
+        self,
+        hand,
+        render_fps: int = 60,
+        window: int = 30,
+        overload: float = 1.1,
+        headroom: float = 0.7,
+        down_delay: float = 1.0,
+        up_delay: float = 5.0,
+        clock=time.perf_counter,
+    ):
+        self.hand = hand
+        self.window = deque(maxlen=window)
+        self.overload = overload
+        self.headroom = headroom
+        self.down_delay = down_delay
+        self.up_delay = up_delay
+        self.clock = clock
+
+        self.base = {
+            "handdraw": getattr(hand, "handdraw", False),
+            "inference_scale": getattr(hand, "inference_scale", 1.0),
+            "infer_every": getattr(hand, "infer_every", 1),
+            "render_fps": render_fps,
+        }
+        self.level = 0
+        self.settings = dict(self.base)
+        self._changed_at = clock()
+
+    @property
+    def render_fps(self) -> int:
+        return self.settings["render_fps"]
+
+    def settings_for(self, level: int) -> dict:
+        """第 level 级的各项设置，只会比基础设置更省"""
+        settings = dict(self.base)
+        for key, value, _ in STEPS[:level]:
+            if key == "handdraw":
+                settings[key] = settings[key] and value
+            elif key == "infer_every":
+                settings[key] = max(settings[key], value)
+            else:
+                settings[key] = min(settings[key], value)
+        return settings
+
+    def record(self, frame_time: float) -> None:
+        self.window.append(frame_time)
+        if len(self.window) < self.window.maxlen:
+            return
+
+        mean = sum(self.window) / len(self.window)
+        elapsed = self.clock() - self._changed_at
+        budget = 1.0 / self.render_fps
+
+        if (
+            mean > budget * self.overload
+            and elapsed >= self.down_delay
+            and self.level < len(STEPS)
+        ):
+            self.set_level(self._next_level(1), mean)
+        elif self.level > 0 and elapsed >= self.up_delay:
+            # 升级后的预算可能更紧（渲染帧率更高），按升级后的预算判断余量
+            level = self._next_level(-1)
+            up_budget = 1.0 / self.settings_for(level)["render_fps"]
+            if mean < up_budget * self.headroom:
+                self.set_level(level, mean)
+
+    def _next_level(self, direction: int) -> int:
+        """跳过与当前设置相同的等级（例如基础 inference_scale 本来就很低）"""
+        level = self.level + direction
+        while 0 < level < len(STEPS) and self.settings_for(level) == self.settings:
+            level += direction
+        return level
+
+    def set_level(self, level: int, mean: float | None = None) -> None:
+        level = max(0, min(level, len(STEPS)))
+        if level == self.level:
+            return
+
+        old = self.level
+        self.level = level
+        self.settings = self.settings_for(level)
+        for key, value in self.settings.items():
+            if key != "render_fps" and hasattr(self.hand, key):
+                setattr(self.hand, key, value)
+
+        # 只列出实际改变了设置的等级
+        low, high = min(old, level), max(old, level)
+        steps = "、".join(
+            STEPS[i][2]
+            for i in range(low, high)
+            if self.settings_for(i + 1) != self.settings_for(i)
+        )
+        change = f"降低画质：{steps}" if level > old else f"恢复画质：撤销{steps}"
+        timing = f"，平均帧时间 {mean * 1000:.1f}ms" if mean is not None else ""
+        print(f"[画质 {old} -> {level}] {change}{timing}")
+
+        self.window.clear()
+        self._changed_at = self.clock()
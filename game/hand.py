@@ -1,15 +1,204 @@
 # import mediapipe.python as mp
 
+import threading
 import time
 
 import cv2
-import mediapipe as mp
+import numpy as np
+
+from buffers import BufferPool
+from filters import OneEuroFilter
+from sources import (
+    apply_capture_mode,
+    negotiate_capture,
+    open_source,
+    read_capture_mode,
+)
+
+
+def transform_landmarks(
+    landmarks, scale: float = 1.0, offset=(0, 0), mirror_width=None, dtype=np.float32
+):
+    """对 (..., 2|3) 的关键点数组一次性做镜像、缩放和平移
+
+    x' = mirror_width - x * scale + offset_x（mirror_width 为 None 时不镜像）
+    y' = y * scale + offset_y
+    返回 dtype 类型的数组（默认 float32），z 分量按 scale 缩放。
+    """
+    landmarks = np.asarray(landmarks, dtype)
+    sx = -scale if mirror_width is not None else scale
+    tx = offset[0] + (mirror_width if mirror_width is not None else 0)
+    coef = np.array([sx, scale, scale][: landmarks.shape[-1]], dtype)
+    bias = np.array([tx, offset[1], 0][: landmarks.shape[-1]], dtype)
+    return landmarks * coef + bias
+
+
+class ThreadedCapture:
+    """后台线程采集画面，写入预分配的环形缓冲区，只把最新一帧交给推理"""
+
+    def __init__(self, cap, ring_size: int = 3, max_wait: float = 0.005):
+        if ring_size < 3:
+            raise ValueError("ring_size 至少为 3")
+
+        self.cap = cap
+        self.ring_size = ring_size
+        self.max_wait = max_wait
+
+        self._ring = None
+        self._stamps = [0.0] * ring_size  # 每个槽位画面读到的时间
+        self.frame_time = 0.0  # 最近一次 read() 返回的画面的采集时间
+        self._latest = -1  # 最新写入完成的槽位
+        self._reading = -1  # 调用方正在使用的槽位
+        self._next = 0
+        self._latest_seq = 0
+        self._read_seq = 0
+        self._cond = threading.Condition()
+        self._stopped = False
+        self._ended = False
+
+        self.grabbed = 0  # 采集到的帧数
+        self.delivered = 0  # 交给推理的新帧数
+        self.dropped = 0  # 未被取走就被覆盖的旧帧数
+        self.reused = 0  # 没有新帧时重复返回的次数
+        self.last_reused = False  # 最近一次 read() 返回的是否是上次的画面
+        self.failed = 0  # 读取失败次数
+
+        # 采集间隔下限，空闲时调大以降低采集帧率；_wake 用于提前结束等待
+        self.min_interval = 0.0
+        self._wake = threading.Event()
+
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def _pick_slot(self) -> int:
+        """选择一个既不是最新帧、也没有被调用方占用的槽位"""
+        for _ in range(self.ring_size):
+            slot = self._next
+            self._next = (self._next + 1) % self.ring_size
+            if slot != self._latest and slot != self._reading:
+                return slot
+        raise RuntimeError("环形缓冲区没有空闲槽位")
+
+    def _run(self):
+        failures = 0
+        while not self._stopped:
+            with self._cond:
+                slot = self._pick_slot()
+                ring = self._ring
+
+            buf = None if ring is None else ring[slot]
+            ret, img = self.cap.read() if buf is None else self.cap.read(buf)
+            stamp = time.perf_counter()
+
+            if not ret:
+                self.failed += 1
+                failures += 1
+                if failures >= 50 or not self.cap.isOpened():
+                    with self._cond:
+                        self._ended = True
+                        self._cond.notify_all()
+                    return
+                time.sleep(0.01)
+                continue
+            failures = 0
+
+            if ring is None or img.shape != ring.shape[1:]:
+                # 第一帧或分辨率发生变化时（重新）分配缓冲区
+                with self._cond:
+                    self._ring = ring = np.empty(
+                        (self.ring_size,) + img.shape, img.dtype
+                    )
+                    self._latest = -1
+                    self._reading = -1
+                buf = None
+            if img is not buf:
+                np.copyto(ring[slot], img)
+
+            with self._cond:
+                self.grabbed += 1
+                if self._latest_seq != self._read_seq:
+                    self.dropped += 1
+                self._stamps[slot] = stamp
+                self._latest = slot
+                self._latest_seq += 1
+                self._cond.notify_all()
+
+            interval = self.min_interval
+            if interval > 0:
+                self._wake.wait(interval - (time.perf_counter() - stamp))
+                self._wake.clear()
+
+    def set_rate(self, fps: float | None) -> None:
+        """限制采集帧率，None 表示按摄像头帧率全速采集"""
+        self.min_interval = 1.0 / fps if fps else 0.0
+        self._wake.set()
+
+    def has_new_frame(self) -> bool:
+        """是否有尚未被 read() 取走的新画面"""
+        return self._latest_seq != self._read_seq
+
+    def read(self):
+        """返回最新一帧，返回的数组在下一次 read() 之前有效"""
+        with self._cond:
+            if self._latest_seq == self._read_seq:
+                # 第一帧可能需要等摄像头启动，之后只做短暂等待
+                timeout = 2.0 if self._read_seq == 0 else self.max_wait
+                self._cond.wait_for(
+                    lambda: self._latest_seq != self._read_seq
+                    or self._ended
+                    or self._stopped,
+                    timeout,
+                )
+
+            if self._latest < 0:
+                return False, None
+
+            self.last_reused = self._latest_seq == self._read_seq
+            if self.last_reused:
+                if self._ended:
+                    return False, None
+                self.reused += 1
+            else:
+                self.delivered += 1
+
+            self._read_seq = self._latest_seq
+            self._reading = self._latest
+            self.frame_time = self._stamps[self._latest]
+            return True, self._ring[self._latest]
+
+    def stats(self) -> dict[str, int]:
+        """返回采集统计信息"""
+        return {
+            "grabbed": self.grabbed,
+            "delivered": self.delivered,
+            "dropped": self.dropped,
+            "reused": self.reused,
+            "failed": self.failed,
+        }
+
+    def get(self, prop_id):
+        return self.cap.get(prop_id)
+
+    def set(self, prop_id, value):
+        return self.cap.set(prop_id, value)
+
+    def isOpened(self) -> bool:
+        return not self._stopped and self.cap.isOpened()
+
+    def release(self):
+        with self._cond:
+            self._stopped = True
+            self._cond.notify_all()
+        self._wake.set()
+        if self._thread.is_alive() and self._thread is not threading.current_thread():
+            self._thread.join(timeout=1.0)
+        self.cap.release()
 
 
 class HandBind:
     def __init__(
         self,
-        camera_id: int = 0,
+        camera_id: int | None = 0,
         handdraw: bool = False,
         draw_fps: bool = False,
         draw_index: bool = False,
@@ -17,34 +206,258 @@ class HandBind:
         max_hands: int = 2,
         detection_confidence: float = 0.5,
         tracking_confidence: float = 0.5,
+        threaded_capture: bool = False,
+        ring_size: int = 3,
+        inference_worker: bool = False,
+        landmark_format: str = "list",
+        landmark_dtype=np.int32,
+        inference_scale: float = 1.0,
+        roi_tracking: bool = False,
+        roi_padding: float = 0.6,
+        roi_redetect: int = 30,
+        infer_every: int = 1,
+        adaptive_skip: bool = False,
+        motion_threshold: float = 0.3,
+        max_skip: int = 3,
+        source=None,
+        record_path=None,
+        profile: bool = False,
+        capture_width: int | None = None,
+        capture_height: int | None = None,
+        capture_fps: float | None = None,
+        fourcc: str | None = None,
+        capture_buffer_size: int | None = None,
+        auto_negotiate: bool = False,
+        reuse_buffers: bool = False,
+        smoothing: bool = False,
+        min_cutoff=1.0,
+        beta=8.0,
+        predict_latency: float | str | None = None,
+        camera_latency: float = 0.03,
+        max_predict: float = 0.1,
+        gestures: bool = False,
+        pinch_threshold: float = 20.0,
+        fast_overlay: bool = True,
+        overlay_layer: bool = False,
+        backend: str = "solutions",
+        model_complexity: int = 1,
+        model_path: str | None = None,
     ):
 
         self.handdraw = handdraw
         self.draw_fps = draw_fps
         self.draw_index = draw_index
         self.verbose = verbose
+        self.max_hands = max_hands
+        self.detection_confidence = detection_confidence
+        self.tracking_confidence = tracking_confidence
         self._released = False
-
-        self.cap = cv2.VideoCapture(camera_id)
+        # 初始化各步骤耗时（秒），用于启动耗时报告
+        self.init_times: dict[str, float] = {}
+        init_start = time.perf_counter()
+
+        if landmark_format not in ("list", "numpy"):
+            raise ValueError(f"未知的关键点格式: {landmark_format}")
+        self.landmark_format = landmark_format
+        self.landmark_dtype = np.dtype(landmark_dtype)
+
+        # backend="solutions" 为 mp.solutions.hands（model_complexity 可选 0 或 1），
+        # "tasks" 为 HandLandmarker 的 LIVE_STREAM 模式，model_path 指定 .task 模型
+        if backend not in ("solutions", "tasks"):
+            raise ValueError(f"未知的推理后端: {backend}")
+        if model_complexity not in (0, 1):
+            raise ValueError("model_complexity 只能是 0 或 1")
+        if backend == "tasks" and inference_worker:
+            raise ValueError("tasks 后端自带异步推理，不能与 inference_worker 同时使用")
+        self.backend = backend
+        self.model_complexity = model_complexity
+        self.model_path = model_path
+        self.result_age = 0.0  # tasks 后端：返回的结果比当前画面晚多少秒
+
+        if not 0 < inference_scale <= 1:
+            raise ValueError("inference_scale 必须在 (0, 1] 范围内")
+        self.inference_scale = inference_scale
+        self.roi_tracking = roi_tracking
+        # 裁剪区域太紧时 MediaPipe 的手掌检测在裁剪画面里找不到手，
+        # 裁剪用的实例一直无法开始跟踪；默认向外扩展包围盒边长的 0.6 倍
+        self.roi_padding = roi_padding
+        self.roi_redetect = roi_redetect
+        self._roi = None  # 上一帧手部所在区域 (x0, y0, x1, y1)，像素坐标
+        self._roi_frames = 0
+        # 裁剪区域用单独的 Hands 实例：MediaPipe 的跟踪依赖上一张输入画面的坐标系，
+        # 与整幅画面交替输入会让跟踪失效、每帧重新做手掌检测。实例按区域内的手数
+        # 创建，跟踪到的手数达到 max_num_hands 后 MediaPipe 不再做手掌检测
+        self.roi_hands = {}  # 手数 -> Hands
+        self._roi_count = 0
+
+        # 跳帧推理：中间帧用匀速模型预测关键点，predicted 标记本帧是否为预测值
+        if infer_every < 1 or max_skip < 1:
+            raise ValueError("infer_every 和 max_skip 至少为 1")
+        self.infer_every = infer_every
+        self.adaptive_skip = adaptive_skip
+        self.motion_threshold = motion_threshold  # 归一化坐标/秒
+        self.max_skip = max_skip
+        self.predicted = False
+        self._skipped = 0
+        self._track_count = 0
+        self._track_time = 0.0
+        self._track_pos = np.zeros((max_hands, 21, 3), np.float32)
+        self._track_vel = np.zeros((max_hands, 21, 3), np.float32)
+        self._pred_buf = np.zeros((max_hands, 21, 3), np.float32)
+
+        # source 可以是 sources.open_source 能识别的描述，也可以是现成的帧来源对象
+        if source is None:
+            self.cap = self._open_camera(camera_id)
+        elif isinstance(source, (int, str)):
+            self.cap = open_source(source)
+        else:
+            self.cap = source
         if not self.cap.isOpened():
-            raise ValueError(f"无法打开摄像头 {camera_id}")
+            if source is None:
+                raise ValueError(f"无法打开摄像头 {camera_id}")
+            raise ValueError(f"无法打开帧来源 {source}")
+        self.init_times["open"] = time.perf_counter() - init_start
+
+        # 采集格式：显式指定的参数优先，auto_negotiate 时自动挑选最快的模式
+        if auto_negotiate:
+            self.capture_mode = negotiate_capture(self.cap)
+        elif capture_width or capture_height or capture_fps or fourcc:
+            self.capture_mode = apply_capture_mode(
+                self.cap,
+                capture_width,
+                capture_height,
+                capture_fps,
+                fourcc,
+                capture_buffer_size,
+            )
+        else:
+            if capture_buffer_size:
+                self.cap.set(cv2.CAP_PROP_BUFFERSIZE, capture_buffer_size)
+            self.capture_mode = read_capture_mode(self.cap)
+        if self.verbose:
+            print(f"采集模式: {self.capture_mode}")
+
+        if threaded_capture:
+            self.cap = ThreadedCapture(self.cap, ring_size=ring_size)
+        self.init_times["capture"] = (
+            time.perf_counter() - init_start - self.init_times["open"]
+        )
 
+        # mediapipe 导入很慢，推迟到真正创建 HandBind 时
+        step_start = time.perf_counter()
+        import mediapipe as mp
+
+        self.init_times["import_mediapipe"] = time.perf_counter() - step_start
+        step_start = time.perf_counter()
         self.hand = mp.solutions.hands
-        self.hands = self.hand.Hands(
-            static_image_mode=False,
-            max_num_hands=max_hands,
-            min_detection_confidence=detection_confidence,
-            min_tracking_confidence=tracking_confidence,
-        )
+        self.hands = None
+        self.worker = None
+        self.landmarker = None
+        self.inference_worker = inference_worker
+        if backend == "tasks":
+            from hand_tasks import LiveStreamLandmarker
+
+            self.landmarker = LiveStreamLandmarker(
+                model_path,
+                max_hands=max_hands,
+                detection_confidence=detection_confidence,
+                tracking_confidence=tracking_confidence,
+            )
+        elif not inference_worker:
+            # roi_tracking 时整幅画面只用于首次检测、裁剪区域丢失后的补救和定期
+            # 全图检测，两次之间隔着多帧，跟踪状态已经过时，用静态模式每次都检测
+            self.hands = self.hand.Hands(
+                static_image_mode=roi_tracking,
+                max_num_hands=max_hands,
+                model_complexity=model_complexity,
+                min_detection_confidence=detection_confidence,
+                min_tracking_confidence=tracking_confidence,
+            )
+        self.init_times["model"] = time.perf_counter() - step_start
+        # reuse_buffers=True 时采集画面、颜色转换、缩放和关键点数组都写入预分配的
+        # 缓冲区，返回的画面和关键点数组在下一次 process_frame() 时会被覆盖
+        self.pool = BufferPool() if reuse_buffers else None
+
+        self._norm_buf = np.zeros((max_hands, 21, 3), np.float32)
+        self._flat_buf = self._norm_buf.reshape(max_hands, 63)
+        # 归一化坐标换算成像素用的 (宽, 高, 宽)，画面尺寸变化时才更新
+        self._pixel_scale = np.zeros(3, np.float32)
+        # 非线程采集时把下一帧读进上一帧的数组（需要 reuse_buffers）
+        self._read_into = reuse_buffers and not threaded_capture
+        self._frame_buf = None
 
         self.mp_draw = mp.solutions.drawing_utils
         self.handLmsStyle = self.mp_draw.DrawingSpec(thickness=2, color=(0, 0, 255))
         self.handConStyle = self.mp_draw.DrawingSpec(thickness=2, color=(0, 255, 0))
 
+        # 关键点叠加：fast_overlay 时批量绘制，否则沿用 MediaPipe 的绘制函数。
+        # overlay_layer=True 时画在与画面同尺寸的 self.layer 上（黑色为透明），
+        # 摄像头画面保持干净，前端可以用 self.overlay.composite() 自行合成
+        self.overlay = None
+        if fast_overlay:
+            from overlay import LandmarkOverlay
+
+            self.overlay = LandmarkOverlay(max_hands)
+        self.use_overlay_layer = overlay_layer
+        self.layer = None
+
+        # 录制关键点，第一帧拿到画面尺寸后再创建文件
+        self.record_path = record_path
+        self.recorder = None
+
+        # 分阶段耗时统计：grab / convert / inference / extract / overlay
+        self.timer = None
+        if profile:
+            from stats import StageTimer
+
+            self.timer = StageTimer()
+
+        # One Euro 平滑与延迟补偿。min_cutoff / beta 可以用
+        # filters.landmark_params() 为每个关键点单独配置；predict_latency 为
+        # "auto" 时按实测的流水线延迟加上 camera_latency 外推，最多 max_predict 秒
+        self.smoother = OneEuroFilter(min_cutoff, beta) if smoothing else None
+        self.predict_latency = predict_latency
+        self.camera_latency = camera_latency
+        self.max_predict = max_predict
+        self.pipeline_latency = 0.0  # 从拿到画面到 process_frame 返回的平均耗时
+        self._frame_time = 0.0
+        self._last_result = None  # 没有新画面时原样返回的上一帧结果
+        self._smooth_buf = np.zeros((max_hands, 21, 3), np.float32)
+
+        # 手势事件：每帧根据像素坐标统一识别一次，前端通过 poll_events() 读取
+        self.gestures = None
+        if gestures:
+            from gestures import GestureEngine
+
+            self.gestures = GestureEngine(max_hands, pinch_threshold)
+
+        # 空闲模式：降低采集帧率和推理分辨率，由 set_idle() 切换
+        self.idle = False
+        self._active_scale = inference_scale
+
         self.frame_count = 0
         self.fps = 0
         self.start_time = time.time()
 
+    @staticmethod
+    def _open_camera(camera_id):
+        """打开指定摄像头；camera_id 为 None 或打不开时改用探测到的第一个摄像头"""
+        if camera_id is not None:
+            cap = cv2.VideoCapture(camera_id)
+            if cap.isOpened():
+                return cap
+            cap.release()
+
+        from camera_find import find_cameras
+
+        cameras = find_cameras()
+        if not cameras:
+            return cv2.VideoCapture(camera_id if camera_id is not None else 0)
+
+        if camera_id is not None:
+            print(f"无法打开摄像头 {camera_id}，改用摄像头 {cameras[0]['index']}")
+        return cv2.VideoCapture(cameras[0]["index"])
+
     def fps_calculate(self, img) -> None:
         """计算并显示FPS"""
         if not self.draw_fps:
@@ -69,43 +482,76 @@ class HandBind:
         )
 
     def process_frame(self):
-        """处理单帧图像并返回处理后的图像和手部关键点坐标"""
+        """处理单帧图像并返回处理后的图像和手部关键点坐标
+
+        landmark_format="numpy" 时关键点为 (n_hands, 21, 3) 的数组，
+        依次是像素 x、像素 y 和按画面宽度缩放的 z。
+        """
         if self._released:
             return False, None, []
 
-        ret, img = self.cap.read()
+        if self.timer is not None:
+            self.timer.start()
+
+        if self._frame_buf is not None:
+            ret, img = self.cap.read(self._frame_buf)
+        else:
+            ret, img = self.cap.read()
         if not ret:
             return False, None, []
+        if self._read_into:
+            self._frame_buf = img
+        if getattr(self.cap, "last_reused", False) and self._last_result is not None:
+            # 同一张画面已经推理并绘制过，再推理只是浪费，再绘制会叠在旧标注上
+            return self._last_result
+        self._frame_time = getattr(self.cap, "frame_time", 0.0) or time.perf_counter()
+        self._lap("grab")
 
-        imgrgb = cv2.cvtColor(img, cv2.COLOR_BGR2RGB)
-        result = self.hands.process(imgrgb)
+        hands = self._smooth(self._estimate(img))
 
         img_height, img_width = img.shape[:2]
-        hand_landmarks_list = []
-
-        if result.multi_hand_landmarks:
-            for hand_idx, handLms in enumerate(result.multi_hand_landmarks):
-                if self.handdraw:
-                    self.mp_draw.draw_landmarks(
-                        img,
-                        handLms,
-                        self.hand.HAND_CONNECTIONS,
-                        self.handLmsStyle,
-                        self.handConStyle,
-                    )
-
-                current_hand_landmarks = []
-
-                for i, lm in enumerate(handLms.landmark):
-                    x_pos, y_pos = int(lm.x * img_width), int(lm.y * img_height)
-
-                    current_hand_landmarks.append((x_pos, y_pos))
-
-                    if self.draw_index:
+        # 一次性把归一化坐标换算成像素坐标（与 int() 一样向零取整）
+        points = self._buffer("points", hands.shape, self.landmark_dtype)
+        if self._pixel_scale[0] != img_width or self._pixel_scale[1] != img_height:
+            self._pixel_scale[:] = (img_width, img_height, img_width)
+        np.multiply(hands, self._pixel_scale, out=points, casting="unsafe")
+
+        if self.landmark_format == "numpy":
+            hand_landmarks_list = points
+        else:
+            hand_landmarks_list = [
+                [(int(x), int(y)) for x, y, _ in hand_points]
+                for hand_points in points.tolist()
+            ]
+
+        if self.record_path:
+            if self.recorder is None:
+                from recording import LandmarkRecorder
+
+                self.recorder = LandmarkRecorder(
+                    self.record_path, self.max_hands, img_width, img_height
+                )
+            self.recorder.write(points, self.predicted)
+        if self.gestures is not None:
+            self.gestures.update(points, self._frame_time)
+        self._lap("extract")
+
+        canvas = self._overlay_canvas(img)
+        if self.overlay is not None:
+            self.overlay.draw(canvas, points, self.handdraw, self.draw_index)
+        elif self.handdraw:
+            for hand_norm in hands:
+                self._draw_hand(canvas, hand_norm)
+
+        draw_index = self.draw_index and self.overlay is None
+        if draw_index or self.verbose:
+            for hand_idx, hand_points in enumerate(points.tolist()):
+                for i, (x_pos, y_pos, _) in enumerate(hand_points):
+                    if draw_index:
                         cv2.putText(
-                            img,
+                            canvas,
                             str(i),
-                            (x_pos - 15, y_pos + 5),
+                            (int(x_pos) - 15, int(y_pos) + 5),
                             cv2.FONT_HERSHEY_COMPLEX,
                             0.3,
                             (0, 255, 255),
@@ -115,28 +561,448 @@ class HandBind:
                     if self.verbose and hand_idx == 0:
                         print(f"Hand {hand_idx}, Landmark {i}: ({x_pos}, {y_pos})")
 
-                hand_landmarks_list.append(current_hand_landmarks)
-
         # img = cv2.flip(img, 1)
         self.fps_calculate(img)
 
-        return True, img, hand_landmarks_list
+        if self.timer is not None:
+            self.timer.lap("overlay")
+            self.timer.finish()
+
+        latency = time.perf_counter() - self._frame_time
+        self.pipeline_latency += 0.1 * (latency - self.pipeline_latency)
+
+        self._last_result = (True, img, hand_landmarks_list)
+        return self._last_result
+
+    async def frames(self, maxsize: int = 2, drop_oldest: bool = True, executor=None):
+        """异步逐帧产出 process_frame() 的结果，用法：async for frame in hand.frames()
+
+        采集和推理在线程池中运行，不阻塞事件循环。队列满时 drop_oldest=True
+        丢弃最旧的一帧（计入 async_dropped），否则暂停采集等待消费（背压）。
+        每帧画面和关键点拷贝到预分配的缓冲区中，产出的结果在取下一帧之前有效。
+        """
+        import asyncio
+        from collections import deque
+        from concurrent.futures import ThreadPoolExecutor
+
+        loop = asyncio.get_running_loop()
+        own_executor = executor is None
+        if own_executor:
+            executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="hand")
+
+        queue = asyncio.Queue(maxsize)
+        # 队列中的帧 + 消费方持有的一帧 + 正在写入的一帧
+        free = deque([None] * (maxsize + 2))
+        self.async_dropped = 0
+
+        def grab(slot):
+            if slot is None:
+                slot = {}
+            success, img, landmarks = self.process_frame()
+            if success and img is not None:
+                buf = slot.get("img")
+                if buf is None or buf.shape != img.shape:
+                    buf = slot["img"] = np.empty_like(img)
+                np.copyto(buf, img)
+                img = buf
+            if isinstance(landmarks, np.ndarray):
+                # 复用缓冲区时关键点数组下一帧会被改写，同样拷贝到这一帧的槽位
+                store = slot.get("landmarks")
+                if (
+                    store is None
+                    or len(store) < len(landmarks)
+                    or store.shape[1:] != landmarks.shape[1:]
+                    or store.dtype != landmarks.dtype
+                ):
+                    store = slot["landmarks"] = np.empty(
+                        (max(len(landmarks), self.max_hands),) + landmarks.shape[1:],
+                        landmarks.dtype,
+                    )
+                np.copyto(store[: len(landmarks)], landmarks)
+                landmarks = store[: len(landmarks)]
+            return success, img, landmarks, slot
+
+        async def produce():
+            # 正常结束和出错都放入结束标记，出错时连同异常一起交给消费方
+            # （被取消时消费方已经退出，不需要标记）
+            end = None
+            try:
+                while not self._released:
+                    success, img, landmarks, buf = await loop.run_in_executor(
+                        executor, grab, free.popleft()
+                    )
+                    if not success:
+                        free.append(buf)
+                        break
+                    if queue.full():
+                        if drop_oldest:
+                            free.append(queue.get_nowait()[3])
+                            self.async_dropped += 1
+                    await queue.put((success, img, landmarks, buf))
+            except Exception as e:
+                end = e
+            await queue.put((end,))
+
+        producer = asyncio.create_task(produce())
+        held = None
+        try:
+            while True:
+                item = await queue.get()
+                if held is not None:
+                    free.append(held)
+                if len(item) == 1:
+                    if item[0] is not None:
+                        raise item[0]
+                    break
+                held = item[3]
+                yield item[:3]
+        finally:
+            producer.cancel()
+            try:
+                await producer
+            except asyncio.CancelledError:
+                pass
+            if own_executor:
+                executor.shutdown(wait=False)
+
+    def _lap(self, stage: str) -> None:
+        if self.timer is not None:
+            self.timer.lap(stage)
+
+    def get_stats(self) -> dict[str, dict[str, float]]:
+        """返回各阶段耗时的 p50/p95/p99 等统计（毫秒），未开启 profile 时为空"""
+        if self.timer is None:
+            return {}
+        return self.timer.stats()
+
+    def _smooth(self, hands):
+        """One Euro 平滑，并按延迟把关键点向前外推"""
+        if self.smoother is None:
+            return hands
+        if not len(hands):
+            self.smoother.reset()
+            return hands
+
+        self.smoother(hands, self._frame_time)
+
+        if self.predict_latency == "auto":
+            horizon = self.pipeline_latency + self.camera_latency
+        else:
+            horizon = self.predict_latency or 0.0
+        horizon = min(horizon, self.max_predict)
+
+        out = self._smooth_buf[: len(hands)]
+        if horizon > 0:
+            self.smoother.predict(horizon, out=out)
+        else:
+            np.copyto(out, self.smoother.x)
+        self._lap("smooth")
+        return out
+
+    def _estimate(self, img):
+        """决定本帧是运行模型还是用上一次的结果外推"""
+        now = time.perf_counter()
+
+        if self._track_count and self._skipped + 1 < self._skip_interval():
+            self._skipped += 1
+            self.predicted = True
+            count = self._track_count
+            pred = self._pred_buf[:count]
+            np.multiply(self._track_vel[:count], now - self._track_time, out=pred)
+            pred += self._track_pos[:count]
+            self._lap("predict")
+            return pred
+
+        hands = self._infer(img)
+        self._skipped = 0
+        self.predicted = False
+        self._update_track(hands, now)
+        return hands
+
+    def _skip_interval(self) -> int:
+        """当前每隔几帧运行一次模型"""
+        if not self.adaptive_skip:
+            return self.infer_every
+
+        # 手部移动缓慢时才跳帧，动作快时每帧都推理
+        speed = np.abs(self._track_vel[: self._track_count, :, :2]).max()
+        return self.max_skip if speed < self.motion_threshold else 1
+
+    def _update_track(self, hands, now: float) -> None:
+        """用最新的推理结果更新匀速模型"""
+        count = len(hands)
+        dt = now - self._track_time
+        if count and count == self._track_count and dt > 0:
+            np.subtract(hands, self._track_pos[:count], out=self._track_vel[:count])
+            self._track_vel[:count] /= dt
+        else:
+            self._track_vel[:count] = 0
+
+        self._track_pos[:count] = hands
+        self._track_count = count
+        self._track_time = now
+
+    def _infer(self, img):
+        """对一帧画面推理，返回 (n_hands, 21, 3) 的归一化关键点坐标"""
+        img_height, img_width = img.shape[:2]
+        max_side = int(max(img_width, img_height) * self.inference_scale)
+
+        if self.inference_worker:
+            # 子进程只接收缩小后的整幅画面，归一化坐标无需换算
+            return self._infer_worker(self._fit(img, max_side))
+
+        if self.landmarker is not None:
+            # HandLandmarker 自带跟踪，同样只提交整幅画面
+            return self._infer_tasks(self._fit(img, max_side))
+
+        if self.roi_tracking and self._roi is not None:
+            self._roi_frames += 1
+            x0, y0, x1, y1 = self._roi
+            crop = self._fit(img[y0:y1, x0:x1], max_side)
+            hands = self._run_hands(crop, self._roi_model(self._roi_count))
+
+            # 找到了全部的手，或还没到定期全图检测的时候，就只用裁剪区域的结果
+            if len(hands) and (
+                len(hands) == self.max_hands or self._roi_frames < self.roi_redetect
+            ):
+                crop_w, crop_h = (x1 - x0) / img_width, (y1 - y0) / img_height
+                hands *= (crop_w, crop_h, crop_w)
+                hands += (x0 / img_width, y0 / img_height, 0)
+                self._update_roi(hands, img_width, img_height, keep=True)
+                return hands
+
+        hands = self._run_hands(self._fit(img, max_side))
+        if self.roi_tracking:
+            self._roi_frames = 0
+            self._update_roi(hands, img_width, img_height, keep=True)
+        return hands
+
+    def _infer_worker(self, img):
+        if self.worker is not None and self.worker.frame_shape != img.shape:
+            # 分辨率变化后共享内存大小不再匹配，重建子进程
+            self.worker.close()
+            self.worker = None
+        if self.worker is None:
+            from hand_worker import InferenceWorker
+
+            self.worker = InferenceWorker(
+                img.shape,
+                max_hands=self.max_hands,
+                detection_confidence=self.detection_confidence,
+                tracking_confidence=self.tracking_confidence,
+                model_complexity=self.model_complexity,
+            )
+        # 子进程空闲时提交当前帧，返回最近一次完成的结果，不等待推理
+        self.worker.submit(img)
+        hands = self.worker.latest()
+        self._lap("inference")
+        return hands
+
+    def _infer_tasks(self, img):
+        imgrgb = cv2.cvtColor(
+            img, cv2.COLOR_BGR2RGB, dst=self._buffer("rgb", img.shape)
+        )
+        self._lap("convert")
+        # 提交当前帧后立即返回最近一次回调的结果，不等待本帧推理完成
+        self.landmarker.submit(imgrgb, int(self._frame_time * 1000))
+        hands, timestamp_ms = self.landmarker.latest()
+        if timestamp_ms >= 0:
+            self.result_age = self._frame_time - timestamp_ms / 1000
+        self._lap("inference")
+        return hands
+
+    def _roi_model(self, count: int):
+        model = self.roi_hands.get(count)
+        if model is None:
+            model = self.roi_hands[count] = self.hand.Hands(
+                static_image_mode=False,
+                max_num_hands=count,
+                model_complexity=self.model_complexity,
+                min_detection_confidence=self.detection_confidence,
+                min_tracking_confidence=self.tracking_confidence,
+            )
+        return model
+
+    def _run_hands(self, img, model=None):
+        """在进程内运行 MediaPipe，结果写入预分配的缓冲区"""
+        imgrgb = cv2.cvtColor(
+            img, cv2.COLOR_BGR2RGB, dst=self._buffer("rgb", img.shape)
+        )
+        self._lap("convert")
+        result = (self.hands if model is None else model).process(imgrgb)
+        self._lap("inference")
+        found = result.multi_hand_landmarks or []
+        count = min(len(found), self.max_hands)
+
+        # 每只手只做一次切片赋值
+        for hand_idx, handLms in enumerate(found[:count]):
+            self._flat_buf[hand_idx] = [
+                c for lm in handLms.landmark for c in (lm.x, lm.y, lm.z)
+            ]
+        return self._norm_buf[:count]
+
+    def _fit(self, img, max_side: int):
+        """长边超过 max_side 时等比例缩小"""
+        height, width = img.shape[:2]
+        if max(width, height) <= max_side:
+            return img
+        ratio = max_side / max(width, height)
+        size = (max(1, int(width * ratio)), max(1, int(height * ratio)))
+        return cv2.resize(
+            img,
+            size,
+            dst=self._buffer("resize", (size[1], size[0]) + img.shape[2:]),
+            interpolation=cv2.INTER_AREA,
+        )
 
-    def get_img_size(self) -> tuple[int, int]:
-        """返回摄像头的宽度和高度"""
-        return int(self.cap.get(cv2.CAP_PROP_FRAME_WIDTH)), int(
-            self.cap.get(cv2.CAP_PROP_FRAME_HEIGHT)
+    def _buffer(self, name: str, shape, dtype=np.uint8):
+        """开启 reuse_buffers 时从缓冲池取，否则新分配"""
+        if self.pool is None:
+            return np.empty(shape, dtype)
+        return self.pool.get(name, shape, dtype)
+
+    def _update_roi(self, hands, img_width: int, img_height: int, keep=False) -> None:
+        """根据关键点的包围盒更新下一帧的裁剪区域
+
+        keep=True 时，只要手数不变、包围盒向外扩展半个边距后仍在当前区域内，
+        就保持裁剪区域不变，让裁剪用的 Hands 实例能持续跟踪，不必重新检测手掌。
+        """
+        if not len(hands):
+            self._roi = None
+            return
+
+        x_min, y_min = hands[..., :2].min(axis=(0, 1))
+        x_max, y_max = hands[..., :2].max(axis=(0, 1))
+        pad = self.roi_padding * max(x_max - x_min, y_max - y_min)
+
+        if keep and self._roi is not None and len(hands) == self._roi_count:
+            rx0, ry0, rx1, ry1 = self._roi
+            half = pad / 2
+            if (
+                (x_min - half) * img_width >= rx0
+                and (y_min - half) * img_height >= ry0
+                and (x_max + half) * img_width <= rx1
+                and (y_max + half) * img_height <= ry1
+            ):
+                return
+
+        x0 = max(0, int((x_min - pad) * img_width))
+        y0 = max(0, int((y_min - pad) * img_height))
+        x1 = min(img_width, int((x_max + pad) * img_width) + 1)
+        y1 = min(img_height, int((y_max + pad) * img_height) + 1)
+
+        # 区域过小或几乎覆盖整幅画面时直接做全图检测
+        if x1 - x0 < 32 or y1 - y0 < 32 or (x1 - x0) * (y1 - y0) > 0.8 * (
+            img_width * img_height
+        ):
+            self._roi = None
+        else:
+            self._roi = (x0, y0, x1, y1)
+            self._roi_count = len(hands)
+
+    def _overlay_canvas(self, img):
+        """返回本帧关键点的绘制目标：摄像头画面，或清空后的叠加层"""
+        if not self.use_overlay_layer:
+            if self.overlay is not None:
+                self.overlay.dirty = None
+            return img
+
+        if self.layer is None or self.layer.shape != img.shape:
+            self.layer = np.zeros_like(img)
+            if self.overlay is not None:
+                self.overlay.dirty = None
+        elif self.overlay is not None:
+            self.overlay.clear(self.layer)
+        else:
+            self.layer.fill(0)
+        return self.layer
+
+    def _draw_hand(self, img, hand_norm) -> None:
+        """用 MediaPipe 的样式绘制一只手的关键点和连线"""
+        from mediapipe.framework.formats import landmark_pb2
+
+        handLms = landmark_pb2.NormalizedLandmarkList(
+            landmark=[
+                landmark_pb2.NormalizedLandmark(x=x, y=y, z=z)
+                for x, y, z in hand_norm.tolist()
+            ]
+        )
+        self.mp_draw.draw_landmarks(
+            img,
+            handLms,
+            self.hand.HAND_CONNECTIONS,
+            self.handLmsStyle,
+            self.handConStyle,
         )
 
+    def set_idle(
+        self, idle: bool, capture_fps: float = 5.0, inference_scale: float = 0.5
+    ) -> None:
+        """进入或退出空闲模式；退出时恢复进入前的推理分辨率"""
+        if idle == self.idle:
+            return
+        self.idle = idle
+        if idle:
+            self._active_scale = self.inference_scale
+            self.inference_scale = min(self.inference_scale, inference_scale)
+        else:
+            self.inference_scale = self._active_scale
+        if isinstance(self.cap, ThreadedCapture):
+            self.cap.set_rate(capture_fps if idle else None)
+
+    def has_new_frame(self) -> bool:
+        """下一次 process_frame() 能否拿到新画面，非线程采集时总是 True"""
+        if isinstance(self.cap, ThreadedCapture):
+            return self.cap.has_new_frame()
+        return True
+
+    def poll_events(self) -> list:
+        """取出上次调用以来的手势事件，未启用手势识别时返回空列表"""
+        if self.gestures is None:
+            return []
+        return self.gestures.drain()
+
+    def pinching(self, hand: int = 0) -> bool:
+        """指定的手当前是否处于捏合状态"""
+        return self.gestures is not None and self.gestures.pinching[hand]
+
+    def get_img_size(self) -> tuple[int, int]:
+        """返回摄像头的宽度和高度（协商后驱动实际采用的值）"""
+        return self.capture_mode["width"], self.capture_mode["height"]
+
+    def get_capture_stats(self) -> dict[str, int]:
+        """返回后台采集的统计信息（丢帧数等），未开启线程采集时返回空字典"""
+        if isinstance(self.cap, ThreadedCapture):
+            return self.cap.stats()
+        return {}
+
+    def release(self):
+        """释放摄像头和模型资源"""
+        self.__release()
+
     def __release(self):
         if self._released:
             return
 
         self._released = True
 
-        if hasattr(self, "cap") and self.cap.isOpened():
+        # 有限的帧来源读完后 isOpened() 已是 False，但文件句柄和采集线程仍需释放；
+        # 各 release() 都可以重复调用
+        if hasattr(self, "cap"):
             self.cap.release()
 
+        if getattr(self, "worker", None) is not None:
+            self.worker.close()
+
+        if getattr(self, "landmarker", None) is not None:
+            self.landmarker.close()
+
+        if getattr(self, "recorder", None) is not None:
+            self.recorder.close()
+
+        for model in getattr(self, "roi_hands", {}).values():
+            model.close()
+
         if hasattr(self, "hands") and self.hands:
             try:
                 self.hands.close()
@@ -0,0 +1,107 @@
+"""基于 MediaPipe Tasks HandLandmarker 的异步推理后端
+
+LIVE_STREAM 模式下 detect_async() 立即返回，结果由 MediaPipe 的线程通过回调
+送回，并附带提交时的时间戳。推理还没跟上时 MediaPipe 会自行丢掉新提交的帧，
+调用方只需每帧提交并读取最近一次的结果。
+"""
+
+import os
+import threading
+
+import numpy as np
+
+DEFAULT_MODEL_PATH = os.path.join(
+    os.path.expanduser("~"), ".cache", "game_python", "hand_landmarker.task"
+)
+MODEL_URL = (
+    "https://storage.googleapis.com/mediapipe-models/hand_landmarker/"
+    "hand_landmarker/float16/latest/hand_landmarker.task"
+)
+_LANDMARKS = 21
+
+
+class LiveStreamLandmarker:
+    """HandLandmarker 的 LIVE_STREAM 封装
+
+    submit() 提交一帧 RGB 画面，latest() 返回最近一次回调的结果
+    (n_hands, 21, 3) 归一化坐标及其时间戳（毫秒）。两次 latest() 之间没有新
+    结果时返回同一份数组。
+    """
+
+    def __init__(
+        self,
+        model_path: str | None = None,
+        max_hands: int = 2,
+        detection_confidence: float = 0.5,
+        presence_confidence: float = 0.5,
+        tracking_confidence: float = 0.5,
+    ):
+        model_path = model_path or DEFAULT_MODEL_PATH
+        if not os.path.isfile(model_path):
+            raise ValueError(f"找不到 HandLandmarker 模型 {model_path}，可从 {MODEL_URL} 下载")
+
+        import mediapipe as mp
+        from mediapipe.tasks.python import BaseOptions, vision
+
+        self._mp = mp
+        self.max_hands = max_hands
+        self._lock = threading.Lock()
+        # 回调写 _pending，latest() 取走时与 _landmarks 交换
+        self._pending = np.zeros((max_hands, _LANDMARKS, 3), np.float32)
+        self._landmarks = np.zeros_like(self._pending)
+        self._pending_count = 0
+        self._count = 0
+        self._fresh = False
+        self.timestamp_ms = -1  # 最近一次结果对应画面的时间戳
+        self.submitted = 0
+        self.completed = 0
+        self._last_submit_ms = -1
+        self._closed = False
+
+        options = vision.HandLandmarkerOptions(
+            base_options=BaseOptions(model_asset_path=model_path),
+            running_mode=vision.RunningMode.LIVE_STREAM,
+            num_hands=max_hands,
+            min_hand_detection_confidence=detection_confidence,
+            min_hand_presence_confidence=presence_confidence,
+            min_tracking_confidence=tracking_confidence,
+            result_callback=self._on_result,
+        )
+        self._landmarker = vision.HandLandmarker.create_from_options(options)
+
+    def _on_result(self, result, output_image, timestamp_ms: int) -> None:
+        found = result.hand_landmarks or []
+        count = min(len(found), self.max_hands)
+        with self._lock:
+            for hand_idx, hand in enumerate(found[:count]):
+                self._pending[hand_idx] = [(lm.x, lm.y, lm.z) for lm in hand]
+            self._pending_count = count
+            self._fresh = True
+            self.timestamp_ms = timestamp_ms
+            self.completed += 1
+
+    def submit(self, imgrgb, timestamp_ms: int) -> bool:
+        """提交一帧 RGB 画面；时间戳必须单调递增，否则跳过这一帧"""
+        if self._closed or timestamp_ms <= self._last_submit_ms:
+            return False
+        self._last_submit_ms = timestamp_ms
+        image = self._mp.Image(image_format=self._mp.ImageFormat.SRGB, data=imgrgb)
+        self._landmarker.detect_async(image, timestamp_ms)
+        self.submitted += 1
+        return True
+
+    def latest(self):
+        """返回 (关键点, 时间戳毫秒)，还没有任何结果时时间戳为 -1"""
+        with self._lock:
+            if self._fresh:
+                self._landmarks, self._pending = self._pending, self._landmarks
+                self._count = self._pending_count
+                self._fresh = False
+            timestamp_ms = self.timestamp_ms
+        return self._landmarks[: self._count], timestamp_ms
+
+    def close(self) -> None:
+        if self._closed:
+            return
+        self._closed = True
+        self._landmarker.close()
@@ -0,0 +1,200 @@
+"""在子进程中运行 MediaPipe 手部推理
+
+画面通过 multiprocessing.shared_memory 传给子进程，推理结果写回另一块共享内存。
+结果槽只有子进程一个写者，用序号做无锁读写（序号为奇数表示正在写入）。
+"""
+
+import multiprocessing as mproc
+import time
+from multiprocessing import shared_memory
+
+import numpy as np
+
+# 结果头部（int64）: [序号, 已完成的帧号, 手的数量]
+_SEQ, _DONE, _COUNT = 0, 1, 2
+_HEADER_LEN = 4
+_LANDMARKS = 21
+
+
+def _result_views(buf, max_hands: int):
+    header = np.ndarray((_HEADER_LEN,), np.int64, buffer=buf)
+    data = np.ndarray(
+        (max_hands, _LANDMARKS, 3),
+        np.float32,
+        buffer=buf,
+        offset=_HEADER_LEN * 8,
+    )
+    return header, data
+
+
+def _worker_main(
+    conn,
+    frame_name: str,
+    result_name: str,
+    frame_shape: tuple[int, ...],
+    max_hands: int,
+    detection_confidence: float,
+    tracking_confidence: float,
+    model_complexity: int = 1,
+):
+    """子进程入口：等待帧号，读取共享内存中的画面并写回关键点"""
+    import cv2
+    import mediapipe as mp
+
+    frame_shm = shared_memory.SharedMemory(name=frame_name)
+    result_shm = shared_memory.SharedMemory(name=result_name)
+    frame = np.ndarray(frame_shape, np.uint8, buffer=frame_shm.buf)
+    header, data = _result_views(result_shm.buf, max_hands)
+    imgrgb = np.empty(frame_shape, np.uint8)
+
+    hands = mp.solutions.hands.Hands(
+        static_image_mode=False,
+        max_num_hands=max_hands,
+        model_complexity=model_complexity,
+        min_detection_confidence=detection_confidence,
+        min_tracking_confidence=tracking_confidence,
+    )
+
+    try:
+        while True:
+            msg = conn.recv()
+            if msg is None:
+                break
+
+            cv2.cvtColor(frame, cv2.COLOR_BGR2RGB, dst=imgrgb)
+            result = hands.process(imgrgb)
+
+            found = result.multi_hand_landmarks or []
+            count = min(len(found), max_hands)
+
+            header[_SEQ] += 1  # 开始写入
+            for hand_idx, handLms in enumerate(found[:count]):
+                for i, lm in enumerate(handLms.landmark):
+                    data[hand_idx, i] = (lm.x, lm.y, lm.z)
+            header[_COUNT] = count
+            header[_DONE] = msg
+            header[_SEQ] += 1  # 写入完成
+    finally:
+        hands.close()
+        del frame, header, data
+        frame_shm.close()
+        result_shm.close()
+
+
+class InferenceWorker:
+    """父进程一侧的推理子进程句柄
+
+    submit() 只在子进程空闲时提交新帧，latest() 返回最近一次完成的推理结果，
+    因此渲染循环永远不会等待推理。
+    """
+
+    def __init__(
+        self,
+        frame_shape: tuple[int, ...],
+        max_hands: int = 2,
+        detection_confidence: float = 0.5,
+        tracking_confidence: float = 0.5,
+        model_complexity: int = 1,
+    ):
+        self.frame_shape = tuple(frame_shape)
+        self.max_hands = max_hands
+
+        self._frame_shm = shared_memory.SharedMemory(
+            create=True, size=int(np.prod(self.frame_shape))
+        )
+        self._result_shm = shared_memory.SharedMemory(
+            create=True, size=_HEADER_LEN * 8 + max_hands * _LANDMARKS * 3 * 4
+        )
+        self._frame = np.ndarray(
+            self.frame_shape, np.uint8, buffer=self._frame_shm.buf
+        )
+        self._header, self._data = _result_views(self._result_shm.buf, max_hands)
+        self._header[:] = 0
+
+        self._landmarks = np.zeros((max_hands, _LANDMARKS, 3), np.float32)
+        self._scratch = np.zeros_like(self._landmarks)
+        self._count = 0
+        self._submitted = 0
+
+        ctx = mproc.get_context("spawn")
+        self._conn, child_conn = ctx.Pipe()
+        self._process = ctx.Process(
+            target=_worker_main,
+            args=(
+                child_conn,
+                self._frame_shm.name,
+                self._result_shm.name,
+                self.frame_shape,
+                max_hands,
+                detection_confidence,
+                tracking_confidence,
+                model_complexity,
+            ),
+            daemon=True,
+        )
+        self._process.start()
+        child_conn.close()
+        self._closed = False
+
+    def _check_alive(self) -> None:
+        """子进程意外退出后 busy() 会一直为真，这里直接报错而不是静默返回旧结果"""
+        if not self._closed and not self._process.is_alive():
+            raise RuntimeError(
+                f"推理子进程已退出（exitcode={self._process.exitcode}）"
+            )
+
+    def busy(self) -> bool:
+        """子进程是否还在处理上一次提交的帧"""
+        return self._header[_DONE] != self._submitted
+
+    def submit(self, img) -> bool:
+        """子进程空闲时把画面写入共享内存并提交，忙时直接返回 False"""
+        self._check_alive()
+        if self._closed or self.busy():
+            return False
+        if img.shape != self.frame_shape:
+            raise ValueError(
+                f"画面尺寸 {img.shape} 与共享内存 {self.frame_shape} 不一致"
+            )
+
+        np.copyto(self._frame, img)
+        self._submitted += 1
+        self._conn.send(self._submitted)
+        return True
+
+    def latest(self):
+        """无锁读取最近一次推理结果，返回 (n_hands, 21, 3) 的归一化坐标"""
+        self._check_alive()
+        header = self._header
+        for _ in range(100):
+            seq = header[_SEQ]
+            if seq & 1:
+                time.sleep(0)
+                continue
+            count = int(header[_COUNT])
+            np.copyto(self._scratch[:count], self._data[:count])
+            if header[_SEQ] == seq:
+                # 读取期间没有被改写，交换两个缓冲区
+                self._landmarks, self._scratch = self._scratch, self._landmarks
+                self._count = count
+                break
+        return self._landmarks[: self._count]
+
+    def close(self):
+        if self._closed:
+            return
+        self._closed = True
+
+        try:
+            self._conn.send(None)
+        except (BrokenPipeError, OSError):
+            pass
+        self._process.join(timeout=2.0)
+        if self._process.is_alive():
+            self._process.terminate()
+        self._conn.close()
+
+        del self._frame, self._header, self._data
+        for shm in (self._frame_shm, self._result_shm):
+            shm.close()
+            shm.unlink()
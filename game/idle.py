@@ -0,0 +1,80 @@
+"""无人使用时的降频
+
+画面里一段时间没有手、也没有键盘鼠标输入时进入空闲模式：采集帧率和推理
+分辨率降低，主循环只在有新画面或输入时重绘。检测到手或有输入时立即恢复。
+
+只有开始、选择用户和游戏结束界面，以及蛇还没有目标位置的游戏界面可以进入
+空闲模式。游戏中短暂丢失手时蛇仍朝上次的手指位置移动，不能降频。
+"""
+
+import time
+
+# 可以进入空闲模式的界面
+IDLE_STATES = ("start_screen", "user_selection", "game_over")
+
+
+def can_idle(game_state, has_target: bool) -> bool:
+    """game_state 为 None 时不按界面限制"""
+    if game_state is None or game_state in IDLE_STATES:
+        return True
+    return game_state == "playing" and not has_target
+
+
+class IdleController:
+    """空闲检测
+
+    每处理一帧调用 update()，传入本帧是否看到手、是否有输入、当前界面和蛇是否
+    有目标位置（见 can_idle()）；空闲状态变化时调用 hand.set_idle()（没有该
+    方法的对象，例如回放，只切换自身状态）。
+    空闲时主循环按 poll_fps 轮询输入和新画面。
+    """
+
+    def __init__(
+        self,
+        hand,
+        idle_delay: float = 2.0,
+        capture_fps: float = 5.0,
+        inference_scale: float = 0.5,
+        poll_fps: int = 20,
+        clock=time.perf_counter,
+    ):
+        self.hand = hand
+        self.idle_delay = idle_delay
+        self.capture_fps = capture_fps
+        self.inference_scale = inference_scale
+        self.poll_fps = poll_fps
+        self.clock = clock
+        self.idle = False
+        self._last_active = clock()
+
+    def update(
+        self,
+        hand_visible: bool,
+        input_event: bool,
+        game_state=None,
+        has_target: bool = False,
+    ) -> bool:
+        now = self.clock()
+        playing = not can_idle(game_state, has_target)
+        if hand_visible or input_event or playing:
+            self._last_active = now
+            if self.idle:
+                if playing:
+                    reason = "游戏进行中"
+                else:
+                    reason = "检测到手" if hand_visible else "收到输入"
+                self._set_idle(False, reason)
+        elif not self.idle and now - self._last_active >= self.idle_delay:
+            self._set_idle(True, f"{self.idle_delay:g} 秒内没有手和输入")
+        return self.idle
+
+    def _set_idle(self, idle: bool, reason: str) -> None:
+        self.idle = idle
+        if hasattr(self.hand, "set_idle"):
+            self.hand.set_idle(idle, self.capture_fps, self.inference_scale)
+        print(f"{'进入' if idle else '退出'}空闲模式（{reason}）")
+
+    def has_new_frame(self) -> bool:
+        """hand 不支持查询时按总有新画面处理"""
+        has_new_frame = getattr(self.hand, "has_new_frame", None)
+        return has_new_frame() if has_new_frame is not None else True
@@ -0,0 +1,170 @@
+"""按关卡栅格化的障碍物占用图，以及在空闲区域里直接取样的放置工具
+
+食物和障碍物的位置不再反复随机试探，而是先算出所有合法的格子，再从中均匀
+地取一个，没有合法格子时立即返回 None，不会卡住。
+"""
+
+import random
+
+import numpy as np
+
+
+class _CellGrid:
+    """按 cell_size 划分的格子，每格用左上角坐标代表"""
+
+    def __init__(self, width, height, cell_size=1):
+        if cell_size <= 0:
+            raise ValueError("cell_size 必须大于 0")
+        self.width = width
+        self.height = height
+        self.cell_size = cell_size
+        self._xs = np.arange(int(width // cell_size) + 1) * cell_size
+        self._ys = np.arange(int(height // cell_size) + 1) * cell_size
+
+    @property
+    def shape(self):
+        return len(self._ys), len(self._xs)
+
+    def _span(self, coords, low, high):
+        """coords 中落在 [low, high] 内的下标范围"""
+        return (
+            int(np.searchsorted(coords, low, "left")),
+            int(np.searchsorted(coords, high, "right")),
+        )
+
+    def _window(self, x0, y0, x1, y1):
+        """[x0, x1] × [y0, y1] 内的格子：(行切片, 列切片), 各列的 x, 各行的 y"""
+        c0, c1 = self._span(self._xs, x0, x1)
+        r0, r1 = self._span(self._ys, y0, y1)
+        return (slice(r0, r1), slice(c0, c1)), self._xs[c0:c1], self._ys[r0:r1]
+
+    def _disc(self, center, radius):
+        """圆心附近的格子及其到圆心的平方距离"""
+        cx, cy = center
+        window, xs, ys = self._window(cx - radius, cy - radius, cx + radius, cy + radius)
+        dx = xs - cx
+        dy = ys[:, None] - cy
+        return window, dx * dx + dy * dy
+
+
+class OccupancyMap(_CellGrid):
+    """把障碍物和屏幕边缘栅格化成布尔数组，查询一个点只需一次数组下标
+
+    第 (row, col) 格取左上角 (col * cell_size, row * cell_size) 处的
+    Obstacle.contains_point() 结果，cell_size 为 1 时与逐个障碍物判断整数
+    坐标的结果完全相同；cell_size 更大时占用图更小，边缘按格子取整。
+    """
+
+    def __init__(self, width, height, cell_size=1):
+        super().__init__(width, height, cell_size)
+        self.blocked = np.zeros(self.shape, bool)
+        self._free = {}  # 取样范围 -> 范围内未被占用的格子，占用图改变时清空
+
+    def clear(self) -> None:
+        self.blocked[:] = False
+        self._free.clear()
+
+    def add_obstacle(self, obstacle) -> None:
+        self._free.clear()
+        if obstacle.type == "rectangle":
+            window, _, _ = self._window(
+                obstacle.x,
+                obstacle.y,
+                obstacle.x + obstacle.width,
+                obstacle.y + obstacle.height,
+            )
+            self.blocked[window] = True
+        elif obstacle.type == "circle":
+            window, dist_sq = self._disc(obstacle.center, obstacle.radius)
+            self.blocked[window] |= dist_sq <= obstacle.radius * obstacle.radius
+
+    def add_margin(self, margin) -> None:
+        """离屏幕边缘不到 margin 的区域（x < margin 或 x > width - margin）"""
+        self._free.clear()
+        self.blocked[:, self._xs < margin] = True
+        self.blocked[:, self._xs > self.width - margin] = True
+        self.blocked[self._ys < margin, :] = True
+        self.blocked[self._ys > self.height - margin, :] = True
+
+    def blocked_at(self, point) -> bool:
+        """屏幕外的点视为被占用"""
+        col = int(point[0] // self.cell_size)
+        row = int(point[1] // self.cell_size)
+        if not (0 <= row < self.blocked.shape[0] and 0 <= col < self.blocked.shape[1]):
+            return True
+        return bool(self.blocked[row, col])
+
+    def sample_free(self, x0, y0, x1, y1, avoid=(), radius=0.0, tries=32):
+        """在 [x0, x1] × [y0, y1] 内均匀地取一个格子坐标
+
+        格子必须未被占用，且与 avoid 中每个点的距离都大于 radius。没有这样的
+        格子时返回 None。
+
+        先从范围内未被占用的格子（每关只算一次）中随机取，再检查与 avoid 的
+        距离，结果仍是均匀的；连续 tries 次都离 avoid 太近时，才为整张图
+        计算一次合法格子。
+        """
+        key = (x0, y0, x1, y1)
+        if key not in self._free:
+            window, xs, ys = self._window(x0, y0, x1, y1)
+            self._free[key] = (np.flatnonzero(~self.blocked[window]), xs, ys)
+        cells, xs, ys = self._free[key]
+        if not len(cells):
+            return None
+        points = np.asarray(avoid, float).reshape(-1, 2)
+        limit = radius * radius
+        for _ in range(tries):
+            row, col = divmod(int(cells[random.randrange(len(cells))]), len(xs))
+            x, y = xs[col].item(), ys[row].item()
+            gap = points - (x, y)
+            if not len(points) or np.einsum("ij,ij->i", gap, gap).min() > limit:
+                return (x, y)
+
+        free = ~self.blocked
+        for point in points:
+            disc, dist_sq = self._disc(point, radius)
+            free[disc] &= dist_sq > limit
+        window, xs, ys = self._window(x0, y0, x1, y1)
+        return _pick(free[window], xs, ys)
+
+
+class ClearanceMap(_CellGrid):
+    """放置障碍物用的余量场
+
+    field 的每一格记录该位置到已有约束的余量：约束是 (圆心, offset) 时余量
+    为“距离 - offset”，取所有约束中最小的。尺寸为 size 的障碍物中心只能放在
+    余量不小于 size 的格子上。forbid_disc() 另外划出不论尺寸都不能放的区域。
+    约束只更新余量小于 reach 的格子，reach 取可能出现的最大尺寸即可。
+    """
+
+    def __init__(self, width, height, cell_size=1):
+        super().__init__(width, height, cell_size)
+        self.field = np.full(self.shape, np.inf)
+        self.allowed = np.ones(self.shape, bool)
+
+    def reset(self) -> None:
+        self.field.fill(np.inf)
+        self.allowed.fill(True)
+
+    def add_disc(self, center, offset, reach) -> None:
+        window, dist_sq = self._disc(center, offset + reach)
+        np.minimum(self.field[window], np.sqrt(dist_sq) - offset, out=self.field[window])
+
+    def forbid_disc(self, center, radius) -> None:
+        """距离 center 小于 radius 的格子"""
+        window, dist_sq = self._disc(center, radius)
+        self.allowed[window] &= dist_sq >= radius * radius
+
+    def sample(self, x0, y0, x1, y1, size):
+        """在 [x0, x1] × [y0, y1] 内余量不小于 size 的格子中均匀地取一个"""
+        window, xs, ys = self._window(x0, y0, x1, y1)
+        return _pick(self.allowed[window] & (self.field[window] >= size), xs, ys)
+
+
+def _pick(mask, xs, ys):
+    """从 mask 为 True 的格子中均匀取一个，返回 (x, y)，没有时返回 None"""
+    cells = np.flatnonzero(mask)
+    if not len(cells):
+        return None
+    row, col = divmod(int(cells[random.randrange(len(cells))]), mask.shape[1])
+    return (xs[col].item(), ys[row].item())
@@ -0,0 +1,149 @@
+"""手部关键点的快速叠加绘制
+
+LandmarkOverlay 用一次 cv2.polylines 画出所有连线、一次画出所有关键点，
+编号标签预先渲染成掩码，绘制时直接按掩码盖印，不再逐个调用 cv2.putText。
+既可以直接画在摄像头画面上，也可以画在单独的叠加层上，由前端自行合成。
+"""
+
+import cv2
+import numpy as np
+
+# 与 mediapipe.solutions.hands.HAND_CONNECTIONS 相同，按固定顺序排列
+HAND_CONNECTIONS = [
+    (0, 1), (0, 5), (0, 17), (1, 2), (2, 3), (3, 4), (5, 6),
+    (5, 9), (6, 7), (7, 8), (9, 10), (9, 13), (10, 11), (11, 12),
+    (13, 14), (13, 17), (14, 15), (15, 16), (17, 18), (18, 19), (19, 20),
+]  # fmt: skip
+
+
+class LandmarkOverlay:
+    """关键点、连线和编号的批量绘制器
+
+    draw() 的输入为 (n_hands, 21, >=2) 的像素坐标。使用叠加层时，dirty 记录
+    上次绘制覆盖的矩形区域，clear() 和 composite() 只处理这一块区域。
+    """
+
+    def __init__(
+        self,
+        max_hands: int = 2,
+        line_color=(0, 255, 0),
+        point_color=(0, 0, 255),
+        label_color=(0, 255, 255),
+        thickness: int = 2,
+        point_radius: int = 3,
+        font_scale: float = 0.3,
+        label_offset=(-15, 5),
+    ):
+        self.line_color = line_color
+        self.point_color = point_color
+        self.label_color = np.array(label_color, np.uint8)
+        self.thickness = thickness
+        self.point_radius = point_radius
+        self.label_offset = label_offset
+        self.dirty = None  # (x0, y0, x1, y1)
+
+        self._connections = np.array(HAND_CONNECTIONS, np.intp)
+        self._pts = np.zeros((max_hands, 21, 2), np.int32)
+        self._lines = np.zeros((max_hands, len(HAND_CONNECTIONS), 2, 2), np.int32)
+        # 关键点画成长度为零的粗线段，线宽决定圆点大小
+        self._dots = np.zeros((max_hands * 21, 2, 2), np.int32)
+
+        # 21 个编号的像素预先渲染好，合并成一张 (关键点编号, 相对偏移) 表，
+        # 绘制时所有标签一次写入
+        owners, offsets = [], []
+        for i in range(21):
+            pixels = self._render_glyph(str(i), font_scale) + label_offset
+            owners.append(np.full(len(pixels), i, np.intp))
+            offsets.append(pixels)
+        self._label_owner = np.concatenate(owners)
+        self._label_pixels = np.concatenate(offsets).astype(np.int32)
+        self._label_extent = (
+            *self._label_pixels.min(axis=0).tolist(),
+            *(self._label_pixels.max(axis=0) + 1).tolist(),
+        )
+
+    @staticmethod
+    def _render_glyph(text: str, font_scale: float) -> np.ndarray:
+        """返回文字像素相对 cv2.putText 起点（左下角）的 (x, y) 偏移"""
+        font = cv2.FONT_HERSHEY_COMPLEX
+        (width, height), baseline = cv2.getTextSize(text, font, font_scale, 1)
+        canvas = np.zeros((height + baseline + 2, width + 2), np.uint8)
+        cv2.putText(canvas, text, (1, height + 1), font, font_scale, 255, 1)
+        ys, xs = np.nonzero(canvas)
+        return np.stack([xs - 1, ys - height - 1], axis=1)
+
+    def draw(self, img, points, skeleton: bool = True, labels: bool = False) -> None:
+        count = min(len(points), len(self._pts))
+        if count == 0 or not (skeleton or labels):
+            return
+
+        pts = self._pts[:count]
+        np.copyto(pts, points[:count, :, :2], casting="unsafe")
+
+        if skeleton:
+            lines = self._lines[:count]
+            np.take(pts, self._connections, axis=1, out=lines)
+            cv2.polylines(
+                img,
+                lines.reshape(-1, 2, 2),
+                False,
+                self.line_color,
+                self.thickness,
+            )
+
+            dots = self._dots[: count * 21]
+            dots[:, 0] = pts.reshape(-1, 2)
+            dots[:, 1] = dots[:, 0]
+            cv2.polylines(img, dots, False, self.point_color, self.point_radius * 2)
+
+        px0, py0 = pts.reshape(-1, 2).min(axis=0).tolist()
+        px1, py1 = pts.reshape(-1, 2).max(axis=0).tolist()
+        pad = self.point_radius + self.thickness
+        x0, y0, x1, y1 = px0 - pad, py0 - pad, px1 + pad + 1, py1 + pad + 1
+
+        if labels:
+            self._draw_labels(img, pts)
+            lx0, ly0, lx1, ly1 = self._label_extent
+            x0, y0 = min(x0, px0 + lx0), min(y0, py0 + ly0)
+            x1, y1 = max(x1, px1 + lx1), max(y1, py1 + ly1)
+
+        self._mark_dirty(img, x0, y0, x1, y1)
+
+    def _draw_labels(self, img, pts) -> None:
+        pixels = (pts[:, self._label_owner] + self._label_pixels).reshape(-1, 2)
+        xs, ys = pixels[:, 0], pixels[:, 1]
+        # 去掉画面外的像素
+        inside = (xs >= 0) & (ys >= 0) & (xs < img.shape[1]) & (ys < img.shape[0])
+        if not inside.all():
+            xs, ys = xs[inside], ys[inside]
+        img[ys, xs] = self.label_color
+
+    def _mark_dirty(self, img, x0, y0, x1, y1) -> None:
+        height, width = img.shape[:2]
+        rect = (max(0, x0), max(0, y0), min(width, x1), min(height, y1))
+        if rect[0] >= rect[2] or rect[1] >= rect[3]:
+            return
+        if self.dirty is None:
+            self.dirty = rect
+        else:
+            self.dirty = (
+                min(self.dirty[0], rect[0]),
+                min(self.dirty[1], rect[1]),
+                max(self.dirty[2], rect[2]),
+                max(self.dirty[3], rect[3]),
+            )
+
+    def clear(self, layer) -> None:
+        """清空叠加层上次绘制过的区域"""
+        if self.dirty is not None:
+            x0, y0, x1, y1 = self.dirty
+            layer[y0:y1, x0:x1] = 0
+            self.dirty = None
+
+    def composite(self, img, layer) -> None:
+        """把叠加层中非黑色的像素合成到画面上"""
+        if self.dirty is None:
+            return
+        x0, y0, x1, y1 = self.dirty
+        src = layer[y0:y1, x0:x1]
+        np.copyto(img[y0:y1, x0:x1], src, where=src.any(axis=2, keepdims=True))
@@ -0,0 +1,158 @@
+"""手部关键点的录制与回放
+
+文件格式：32 字节文件头，之后是定长记录。每条记录包含相对录制开始的时间戳
+（float64 秒）、手的数量、是否为预测帧，以及 int16 的像素坐标 (max_hands, 21, 2)。
+回放时用 np.memmap 直接映射文件，不需要摄像头和 MediaPipe。
+"""
+
+import os
+import struct
+import time
+
+import numpy as np
+
+MAGIC = b"HLMK"
+VERSION = 1
+HEADER = struct.Struct("<4sHHII16x")  # 魔数、版本、max_hands、宽、高
+
+
+def record_dtype(max_hands: int) -> np.dtype:
+    return np.dtype(
+        [
+            ("t", "<f8"),
+            ("count", "u1"),
+            ("predicted", "u1"),
+            ("xy", "<i2", (max_hands, 21, 2)),
+        ]
+    )
+
+
+class LandmarkRecorder:
+    """把 HandBind 输出的关键点追加写入文件，攒满一批再落盘"""
+
+    def __init__(
+        self, path: str, max_hands: int, width: int, height: int, batch: int = 256
+    ):
+        self.path = path
+        self.max_hands = max_hands
+        self._file = open(path, "wb")
+        self._file.write(HEADER.pack(MAGIC, VERSION, max_hands, width, height))
+        self._records = np.zeros(batch, record_dtype(max_hands))
+        self._pending = 0
+        self._start = time.perf_counter()
+        self.frames = 0
+
+    def write(self, points, predicted: bool = False) -> None:
+        """points 为 (n_hands, 21, >=2) 的像素坐标数组"""
+        records, i = self._records, self._pending
+        count = min(len(points), self.max_hands)
+        records["t"][i] = time.perf_counter() - self._start
+        records["count"][i] = count
+        records["predicted"][i] = predicted
+        records["xy"][i, :count] = np.clip(points[:count, :, :2], -32768, 32767)
+        records["xy"][i, count:] = 0
+
+        self._pending += 1
+        self.frames += 1
+        if self._pending == len(self._records):
+            self.flush()
+
+    def flush(self) -> None:
+        if self._pending:
+            self._file.write(self._records[: self._pending].tobytes())
+            self._pending = 0
+        self._file.flush()
+
+    def close(self) -> None:
+        if not self._file.closed:
+            self.flush()
+            self._file.close()
+
+
+class LandmarkReplay:
+    """回放录制的关键点，接口与 HandBind.process_frame() 一致
+
+    realtime=False 时不等待，按文件顺序尽可能快地出帧；clock() 返回当前帧的
+    录制时间戳，可以替换 SnakeGame.clock，让游戏逻辑按录制时的节奏运行。
+    """
+
+    def __init__(
+        self,
+        path: str,
+        blank_frame: bool = True,
+        landmark_format: str = "list",
+        realtime: bool = False,
+        loop: bool = False,
+    ):
+        with open(path, "rb") as f:
+            magic, version, max_hands, width, height = HEADER.unpack(
+                f.read(HEADER.size)
+            )
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"不是关键点录制文件: {path}")
+
+        self.max_hands = max_hands
+        self.width = width
+        self.height = height
+        self.landmark_format = landmark_format
+        self.realtime = realtime
+        self.loop = loop
+
+        dtype = record_dtype(max_hands)
+        size = (os.path.getsize(path) - HEADER.size) // dtype.itemsize
+        self.records = (
+            np.memmap(path, dtype, mode="r", offset=HEADER.size, shape=(size,))
+            if size
+            else np.zeros(0, dtype)
+        )
+        self.frame = np.zeros((height, width, 3), np.uint8) if blank_frame else None
+        self.position = 0
+        self.predicted = False
+        self._time = 0.0
+        self._offset = 0.0
+        self._start = None
+
+    def __len__(self) -> int:
+        return len(self.records)
+
+    def clock(self) -> float:
+        return self._time
+
+    def process_frame(self):
+        if self.position >= len(self.records):
+            if not self.loop or not len(self.records):
+                return False, None, []
+            # 循环回放时让时钟继续向前走，不回到 0
+            self._offset = self._time + 1 / 30
+            self.position = 0
+            self._start = None
+
+        record = self.records[self.position]
+        self.position += 1
+        self._time = self._offset + float(record["t"])
+        self.predicted = bool(record["predicted"])
+
+        if self.realtime:
+            now = time.perf_counter()
+            if self._start is None:
+                self._start = now - self._time
+            delay = self._start + self._time - now
+            if delay > 0:
+                time.sleep(delay)
+
+        xy = record["xy"][: record["count"]]
+        if self.landmark_format == "numpy":
+            landmarks = np.zeros(xy.shape[:2] + (3,), np.int32)
+            landmarks[..., :2] = xy
+        else:
+            landmarks = [[tuple(point) for point in hand] for hand in xy.tolist()]
+
+        if self.frame is not None:
+            self.frame.fill(0)
+        return True, self.frame, landmarks
+
+    def get_img_size(self) -> tuple[int, int]:
+        return self.width, self.height
+
+    def release(self):
+        self.records = self.records[:0]
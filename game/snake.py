@@ -2,12 +2,25 @@ import random
 import threading
 import time
 
-import cv2
+# 启动耗时报告的起点。cv2、mediapipe 和 openai 都推迟到用到时才导入
+_IMPORT_START = time.perf_counter()
+
+import numpy as np
 import pygame
 import pygame as pg
 
-import getquestion as gq
-import hand as hd
+from buffers import BufferPool
+from body import SnakeBody
+from calibration import load_profile
+from idle import IdleController
+from occupancy import ClearanceMap, OccupancyMap
+from spatial import SnakeBodyIndex, SpatialHash
+from stats import StartupTimer, format_stats
+
+_IMPORT_END = time.perf_counter()
+
+MENU_STATES = ("start_screen", "game_over")
+MENU_FPS = 30
 
 
 class Obstacle:
@@ -18,6 +31,9 @@ class Obstacle:
         self.height = height
         self.type = obstacle_type
         self.color = (100, 100, 255)
+        # 圆形障碍物的圆心和半径，避免每次判断时重新计算
+        self.center = (x + width // 2, y + height // 2)
+        self.radius = min(width, height) // 2
 
     def contains_point(self, point):
         x, y = point
@@ -27,10 +43,8 @@ class Obstacle:
                 and self.y <= y <= self.y + self.height
             )
         elif self.type == "circle":
-            center_x = self.x + self.width // 2
-            center_y = self.y + self.height // 2
-            radius = min(self.width, self.height) // 2
-            return ((x - center_x) ** 2 + (y - center_y) ** 2) <= radius**2
+            center_x, center_y = self.center
+            return ((x - center_x) ** 2 + (y - center_y) ** 2) <= self.radius**2
         return False
 
     def draw(self, screen):
@@ -40,10 +54,8 @@ class Obstacle:
                 screen, (255, 255, 255), (self.x, self.y, self.width, self.height), 2
             )
         elif self.type == "circle":
-            center = (self.x + self.width // 2, self.y + self.height // 2)
-            radius = min(self.width, self.height) // 2
-            pg.draw.circle(screen, self.color, center, radius)
-            pg.draw.circle(screen, (255, 255, 255), center, radius, 2)
+            pg.draw.circle(screen, self.color, self.center, self.radius)
+            pg.draw.circle(screen, (255, 255, 255), self.center, self.radius, 2)
 
 
 class QuestionManager:
@@ -257,6 +269,8 @@ class QuestionManager:
     def gen_question(self):
         """在后台线程中生成问题"""
         try:
+            import getquestion as gq
+
             self.question = gq.convert(gq.get_question())
             self.question_ready = True
         except Exception as e:
@@ -289,7 +303,14 @@ class QuestionManager:
 
 
 class SnakeGame:
-    def __init__(self, width=640, height=480, scale_factor=1.0):
+    def __init__(
+        self,
+        width=640,
+        height=480,
+        scale_factor=1.0,
+        start_questions=True,
+        occupancy_cell=1,
+    ):
         self.scale_factor = scale_factor
         self.base_width = width
         self.base_height = height
@@ -300,7 +321,18 @@ class SnakeGame:
         self.pinch_threshold = 20 * scale_factor
         self.pinch_cooldown = 0.5
         self.last_pinch_time = 0
+        # 由 Game 每帧写入手势引擎的结果后，is_pinch_gesture 不再自行判断距离
+        self.gesture_mode = False
+        self.pinch_clicked = False
         self.obstacles = []
+        # 障碍物、蛇身和食物的空间索引，碰撞和生成时只检查附近的物体
+        self.grid = SpatialHash(40 * scale_factor)
+        self.body_index = SnakeBodyIndex(self.grid)
+        self.snake_pos = SnakeBody()
+        # 每关的障碍物和屏幕边缘占用图，蛇头和食物只查一次数组
+        self.occupancy = OccupancyMap(self.width, self.height, occupancy_cell)
+        self.clearance = ClearanceMap(self.width, self.height, occupancy_cell)
+        self._food_pos = None
         self.current_level = 1
         self.max_level = 10
         self.question_manager = QuestionManager()
@@ -321,18 +353,17 @@ class SnakeGame:
         self.cursor_color = (255, 255, 0)
         self.pinch_active = False
 
-        self.question_manager.start_question_generation()
+        # 游戏逻辑使用的时钟，回放录制数据时可以换成 LandmarkReplay.clock
+        self.clock = time.time
+
+        if start_questions:
+            self.question_manager.start_question_generation()
 
         self.reset_game()
 
     def reset_game(self):
         self.question_manager.reset()
-        start_x, start_y = self.width // 2, self.height // 2
-        self.snake_pos = [(start_x, start_y)]
-
-        segment_distance = 20 * self.scale_factor
-        for i in range(1, 3):
-            self.snake_pos.append((start_x - i * segment_distance, start_y))
+        self.reset_snake()
 
         self.snake_length = 3
         self.food_pos = self.generate_food()
@@ -343,19 +374,70 @@ class SnakeGame:
         self.game_over = False
         self.last_finger_pos = None
         self.last_thumb_pos = None
-        self.last_move_time = time.time()
+        self.last_move_time = self.clock()
         self.last_head_pos = self.snake_pos[0]
 
         self.current_revive_chances = self.max_revive_chances
         self.revive_in_progress = False
 
+    def set_clock(self, clock):
+        """换用另一个时钟（例如回放的时钟），基于旧时钟的时间点一并重置"""
+        self.clock = clock
+        self.last_move_time = clock()
+        self.last_pinch_time = float("-inf")
+
+    def reset_snake(self):
+        start_x, start_y = self.width // 2, self.height // 2
+        positions = [(start_x, start_y)]
+
+        segment_distance = 20 * self.scale_factor
+        for i in range(1, 3):
+            positions.append((start_x - i * segment_distance, start_y))
+        self.set_snake(positions)
+
+    def set_snake(self, positions):
+        """整体替换蛇身，positions 从蛇头到蛇尾"""
+        self.snake_pos.reset(positions)
+        self.body_index.reset(positions)
+
+    @property
+    def food_pos(self):
+        return self._food_pos
+
+    @food_pos.setter
+    def food_pos(self, pos):
+        self._food_pos = pos
+        self.grid.insert(("food", 0), pos[0], pos[1])
+
+    def add_obstacle(self, obstacle):
+        self.obstacles.append(obstacle)
+        self.occupancy.add_obstacle(obstacle)
+        self.grid.insert(
+            ("obstacle", obstacle),
+            obstacle.x,
+            obstacle.y,
+            obstacle.x + obstacle.width,
+            obstacle.y + obstacle.height,
+        )
+
     def generate_obstacles(self):
         self.obstacles = []
+        self.grid.remove_kind("obstacle")
+        self.occupancy.clear()
+        self.occupancy.add_margin(5 * self.scale_factor)
         base_count = 2 + self.current_level * random.randint(5, 10)
 
         safe_radius = 150 * self.scale_factor
         safe_center = (self.width // 2, self.height // 2)
 
+        # 障碍物中心到蛇身、食物和已放置障碍物的间距要求，按余量场预先算好
+        max_half = (40 + self.current_level * 10) * self.scale_factor / 2
+        self.clearance.reset()
+        self.clearance.forbid_disc(safe_center, safe_radius)
+        for pos in self.snake_pos.array:
+            self.clearance.add_disc(pos, 50 * self.scale_factor, max_half)
+        self.clearance.add_disc(self.food_pos, 30 * self.scale_factor, max_half)
+
         for _ in range(base_count):
             min_size = (
                 20 + self.current_level * random.randint(1, 5)
@@ -365,71 +447,41 @@ class SnakeGame:
             ) * self.scale_factor
             width = random.randint(int(min_size), int(max_size))
             height = random.randint(int(min_size), int(max_size))
+            half = min(width, height) // 2
+
+            # 直接在余量足够的位置中均匀取一个中心，没有合法位置时跳过
+            center = self.clearance.sample(
+                50 + width // 2,
+                50 + height // 2,
+                self.width - width - 50 + width // 2,
+                self.height - height - 50 + height // 2,
+                half,
+            )
+            if center is None:
+                continue
 
-            max_attempts = 50
-            obstacle_placed = False
-
-            for attempt in range(max_attempts):
-                x = random.randint(50, self.width - width - 50)
-                y = random.randint(50, self.height - height - 50)
-
-                obstacle_center = (x + width // 2, y + height // 2)
-                distance_to_safe = (
-                    (obstacle_center[0] - safe_center[0]) ** 2
-                    + (obstacle_center[1] - safe_center[1]) ** 2
-                ) ** 0.5
-
-                if distance_to_safe < safe_radius:
-                    continue
-
-                overlap_with_snake = any(
-                    self.distance((x + width // 2, y + height // 2), pos)
-                    < (min(width, height) // 2 + 50 * self.scale_factor)
-                    for pos in self.snake_pos
-                )
-
-                overlap_with_food = self.distance(
-                    (x + width // 2, y + height // 2), self.food_pos
-                ) < (min(width, height) // 2 + 30 * self.scale_factor)
-
-                overlap_with_obstacles = any(
-                    self.distance(
-                        (x + width // 2, y + height // 2),
-                        (obs.x + obs.width // 2, obs.y + obs.height // 2),
-                    )
-                    < (
-                        min(width, height) // 2
-                        + min(obs.width, obs.height) // 2
-                        + 20 * self.scale_factor
-                    )
-                    for obs in self.obstacles
-                )
-
-                if (
-                    not overlap_with_snake
-                    and not overlap_with_food
-                    and not overlap_with_obstacles
-                ):
-                    obstacle_type = "rectangle"
-                    if random.random() < self.current_level * 0.08:
-                        obstacle_type = "circle"
+            obstacle_type = "rectangle"
+            if random.random() < self.current_level * 0.08:
+                obstacle_type = "circle"
 
-                    obstacle = Obstacle(x, y, width, height, obstacle_type)
-                    self.obstacles.append(obstacle)
-                    obstacle_placed = True
-                    break
-
-            if not obstacle_placed:
-                continue
+            obstacle = Obstacle(
+                center[0] - width // 2,
+                center[1] - height // 2,
+                width,
+                height,
+                obstacle_type,
+            )
+            self.add_obstacle(obstacle)
+            self.clearance.add_disc(center, half + 20 * self.scale_factor, max_half)
 
         if self.current_level >= 5:
             border_width = 10 * self.scale_factor
-            self.obstacles.append(Obstacle(0, 0, self.width, border_width))
-            self.obstacles.append(Obstacle(0, 0, border_width, self.height))
-            self.obstacles.append(
+            self.add_obstacle(Obstacle(0, 0, self.width, border_width))
+            self.add_obstacle(Obstacle(0, 0, border_width, self.height))
+            self.add_obstacle(
                 Obstacle(0, self.height - border_width, self.width, border_width)
             )
-            self.obstacles.append(
+            self.add_obstacle(
                 Obstacle(self.width - border_width, 0, border_width, self.height)
             )
 
@@ -437,7 +489,7 @@ class SnakeGame:
             center_x, center_y = self.width // 2, self.height // 2
             cross_width = 20 * self.scale_factor
             cross_height = 100 * self.scale_factor
-            self.obstacles.append(
+            self.add_obstacle(
                 Obstacle(
                     center_x - cross_width // 2,
                     center_y - cross_height // 2,
@@ -445,7 +497,7 @@ class SnakeGame:
                     cross_height,
                 )
             )
-            self.obstacles.append(
+            self.add_obstacle(
                 Obstacle(
                     center_x - cross_height // 2,
                     center_y - cross_width // 2,
@@ -455,30 +507,40 @@ class SnakeGame:
             )
 
     def generate_food(self):
-        max_attempts = 100  # 增加最大尝试次数
-        for attempt in range(max_attempts):
-            food_pos = (
-                random.randint(50, self.width - 50),
-                random.randint(50, self.height - 50),
-            )
-            if all(
-                self.distance(food_pos, pos) > 50 * self.scale_factor
-                for pos in self.snake_pos
-            ) and not any(obs.contains_point(food_pos) for obs in self.obstacles):
-                return food_pos
-
-        return (self.width // 4, self.height // 4)
+        # 在不被障碍物占用、离蛇身超过 50 的格子中均匀取一个
+        food_pos = self.occupancy.sample_free(
+            50,
+            50,
+            self.width - 50,
+            self.height - 50,
+            avoid=self.snake_pos.array,
+            radius=50 * self.scale_factor,
+        )
+        if food_pos is None:
+            return (self.width // 4, self.height // 4)
+        return food_pos
 
     def distance(self, pos1, pos2):
         return ((pos1[0] - pos2[0]) ** 2 + (pos1[1] - pos2[1]) ** 2) ** 0.5
 
+    def apply_gestures(self, events, pinching):
+        """记录手势引擎本帧的捏合点击和捏合状态"""
+        self.gesture_mode = True
+        self.pinch_clicked = any(event.kind == "pinch" for event in events)
+        self.pinch_active = pinching
+
     def is_pinch_gesture(self, index_pos, thumb_pos):
+        if self.gesture_mode:
+            # 每帧的点击只被第一个界面消费一次
+            clicked, self.pinch_clicked = self.pinch_clicked, False
+            return clicked and index_pos is not None
+
         if index_pos is None or thumb_pos is None:
             self.pinch_active = False
             return False
 
         dist = self.distance(index_pos, thumb_pos)
-        current_time = time.time()
+        current_time = self.clock()
 
         if current_time - self.last_pinch_time < self.pinch_cooldown:
             return False
@@ -501,10 +563,12 @@ class SnakeGame:
 
     def update_snake_position(self, new_head):
         """更新蛇身位置 - 使用经典的跟随算法"""
-        self.snake_pos.insert(0, new_head)
+        self.snake_pos.push_head(new_head)
+        self.body_index.push_head(new_head)
 
         if len(self.snake_pos) > self.snake_length:
-            self.snake_pos.pop()
+            self.snake_pos.pop_tail()
+            self.body_index.pop_tail()
 
     def check_collision_with_segment(
         self, point, segment_start, segment_end, threshold=8
@@ -530,30 +594,69 @@ class SnakeGame:
         return self.distance(point, projection) < threshold
 
     def check_self_collision(self, head_pos):
-        """检查蛇头是否与蛇身碰撞"""
-        for i, pos in enumerate(self.snake_pos):
+        """检查蛇头是否与蛇身碰撞
+
+        按 bench_collision.py 的测量，网格查询在各种长度下都最快；另外两种
+        实现规则相同，留作对照。
+        """
+        node_radius = 12 * self.scale_factor
+        segment_end = len(self.snake_pos) - 3
+        # 只检查网格中蛇头附近的节点和线段，判断规则与逐个检查时相同
+        for kind, i in self.body_index.nearby(head_pos, max(node_radius, 8)):
+            if kind == "node":
+                if i >= 3 and self.distance(head_pos, self.snake_pos[i]) < node_radius:
+                    return True
+            elif 1 <= i < segment_end and self.check_collision_with_segment(
+                head_pos, self.snake_pos[i], self.snake_pos[i + 1]
+            ):
+                return True
+
+        return False
+
+    def check_self_collision_scalar(self, head_pos):
+        """逐个节点、逐条线段检查"""
+        body = self.snake_pos.tolist()
+        for i, pos in enumerate(body):
             if i < 3:  # 跳过前3个节点
                 continue
             if self.distance(head_pos, pos) < 12 * self.scale_factor:
                 return True
 
-        for i in range(1, len(self.snake_pos) - 3):  # 跳过前几个线段
-            if self.check_collision_with_segment(
-                head_pos, self.snake_pos[i], self.snake_pos[i + 1]
-            ):
+        for i in range(1, len(body) - 3):  # 跳过前几个线段
+            if self.check_collision_with_segment(head_pos, body[i], body[i + 1]):
                 return True
 
         return False
 
+    def check_self_collision_numpy(self, head_pos, threshold=8):
+        """一次性检查所有节点和线段，用平方距离比较，不开方"""
+        body = self.snake_pos.array
+        count = len(body)
+        head = np.asarray(head_pos, np.float64)
+
+        node_radius = 12 * self.scale_factor
+        offset = body[3:] - head
+        if np.any(np.einsum("ij,ij->i", offset, offset) < node_radius * node_radius):
+            return True
+
+        # 线段 i 连接节点 i 和 i + 1，i 取 1 .. count - 4
+        if count < 5:
+            return False
+        start = body[1 : count - 3]
+        direction = body[2 : count - 2] - start
+        relative = head - start
+        length_sq = np.einsum("ij,ij->i", direction, direction)
+        dot = np.einsum("ij,ij->i", relative, direction)
+        # 长度为 0 的线段 t = 0，退化为到起点的距离
+        t = np.divide(dot, length_sq, out=np.zeros_like(dot), where=length_sq > 0)
+        np.clip(t, 0.0, 1.0, out=t)
+        gap = relative - t[:, None] * direction
+        return bool(np.any(np.einsum("ij,ij->i", gap, gap) < threshold * threshold))
+
     def revive_player(self):
         """复活玩家 - 保留分数和关卡，只重置蛇的位置"""
         if self.current_revive_chances > 0:
-            start_x, start_y = self.width // 2, self.height // 2
-            self.snake_pos = [(start_x, start_y)]
-
-            segment_distance = 20 * self.scale_factor
-            for i in range(1, 3):
-                self.snake_pos.append((start_x - i * segment_distance, start_y))
+            self.reset_snake()
 
             self.snake_length = 3
             self.food_pos = self.generate_food()
@@ -562,7 +665,7 @@ class SnakeGame:
             self.revive_in_progress = False
             self.last_finger_pos = None
             self.last_thumb_pos = None
-            self.last_move_time = time.time()
+            self.last_move_time = self.clock()
             self.last_head_pos = self.snake_pos[0]
 
             return True
@@ -572,7 +675,7 @@ class SnakeGame:
         if self.game_over or self.revive_in_progress:
             return
 
-        current_time = time.time()
+        current_time = self.clock()
         if current_time - self.last_move_time < 0.05:
             return
         self.last_move_time = current_time
@@ -620,19 +723,8 @@ class SnakeGame:
         )
         new_head = (new_x, new_y)
 
-        # 检查是否撞到障碍物
-        for obstacle in self.obstacles:
-            if obstacle.contains_point(new_head):
-                self.game_over = True
-                return
-
-        # 检查是否撞到边界
-        if (
-            new_head[0] < 5 * self.scale_factor
-            or new_head[0] > self.width - 5 * self.scale_factor
-            or new_head[1] < 5 * self.scale_factor
-            or new_head[1] > self.height - 5 * self.scale_factor
-        ):
+        # 检查是否撞到障碍物或边界
+        if self.occupancy.blocked_at(new_head):
             self.game_over = True
             return
 
@@ -662,22 +754,7 @@ class SnakeGame:
         for obstacle in self.obstacles:
             obstacle.draw(screen)
 
-        if len(self.snake_pos) > 1:
-            for i in range(len(self.snake_pos) - 1):
-                start_pos = self.snake_pos[i]
-                end_pos = self.snake_pos[i + 1]
-
-                color_ratio = i / len(self.snake_pos)
-                color = (0, int(200 * (1 - color_ratio)), 0)
-
-                line_width = max(6, int(12 * self.scale_factor))
-                pg.draw.line(screen, color, start_pos, end_pos, line_width)
-
-        if self.snake_pos:
-            head_pos = self.snake_pos[0]
-            head_radius = max(8, int(12 * self.scale_factor))
-            pg.draw.circle(screen, (0, 255, 0), head_pos, head_radius)  # 蛇头
-            pg.draw.circle(screen, (255, 255, 255), head_pos, head_radius, 2)  # 边框
+        self.draw_snake(screen)
 
         food_radius = max(8, int(12 * self.scale_factor))
         pg.draw.circle(screen, (255, 0, 0), self.food_pos, food_radius)
@@ -707,6 +784,26 @@ class SnakeGame:
             )
             screen.blit(hint_text, (self.width // 2 - 150, self.height - 40))
 
+    def draw_snake(self, screen):
+        """绘制蛇身和蛇头"""
+        body = self.snake_pos.tolist()
+        count = len(body)
+        if count > 1:
+            line_width = max(6, int(12 * self.scale_factor))
+            # 线段 i 的绿色分量为 int(200 * (1 - i / count))，最多 201 种；
+            # 相邻同色的线段合并成一次 pg.draw.lines，画出的像素与逐段绘制相同
+            greens = (200 * (1 - np.arange(count - 1) / count)).astype(int)
+            bounds = [0, *(np.flatnonzero(np.diff(greens)) + 1).tolist(), count - 1]
+            for start, end in zip(bounds, bounds[1:]):
+                color = (0, int(greens[start]), 0)
+                pg.draw.lines(screen, color, False, body[start : end + 1], line_width)
+
+        if body:
+            head_pos = body[0]
+            head_radius = max(8, int(12 * self.scale_factor))
+            pg.draw.circle(screen, (0, 255, 0), head_pos, head_radius)  # 蛇头
+            pg.draw.circle(screen, (255, 255, 255), head_pos, head_radius, 2)  # 边框
+
     def draw_cursor(self, screen, finger_pos):
         """绘制触摸光标"""
         if finger_pos:
@@ -991,56 +1088,207 @@ class SnakeGame:
 
 
 class Game:
-    def __init__(self, scale_factor=1.0):
-        pg.init()
-        pg.display.set_caption("贪吃蛇游戏 - 手势与鼠标控制")
+    def __init__(
+        self,
+        scale_factor=1.0,
+        source=None,
+        hand=None,
+        reuse_buffers=True,
+        lazy_start=False,
+        startup_size=(640, 480),
+        governor=True,
+    ):
+        """lazy_start=True 时先按 startup_size 显示开始界面，摄像头和 MediaPipe
+        在后台线程中初始化，完成后再按实际画面尺寸调整窗口"""
+        self.startup = StartupTimer(origin=_IMPORT_START)
+        self.startup.add("导入 pygame 等", _IMPORT_END - _IMPORT_START, _IMPORT_START)
 
-        self.hand = hd.HandBind(
+        with self.startup.measure("pygame 初始化"):
+            pg.init()
+            pg.display.set_caption("贪吃蛇游戏 - 手势与鼠标控制")
+
+        self.scale_factor = scale_factor
+        self.clock = pg.time.Clock()
+        self.quit = False
+        self.game_state = "start_screen"
+        self.mouse_clicked = False
+
+        # 画面镜像、颜色转换和缩放都写入常驻的缓冲区和 Surface
+        self.reuse_buffers = reuse_buffers
+        self.pool = BufferPool()
+        self._frame_surface = None
+        self._scaled_surface = None
+        self._surface_misses = -1
+
+        # 持续超出帧预算时自动降低画质，拿到 hand 之后创建
+        self.use_governor = governor
+        self.governor = None
+
+        # hand 可以传入 recording.LandmarkReplay 等实现了 process_frame 的对象
+        self.hand = None
+        self.original_size = None
+        self._loaded_hand = None
+        self._hand_error = None
+        self._hand_loader = None
+        if hand is None and lazy_start:
+            self._setup_display(startup_size)
+            self._hand_loader = threading.Thread(
+                target=self._load_hand,
+                args=(source, reuse_buffers),
+                name="hand-init",
+                daemon=True,
+            )
+            self._hand_loader.start()
+        else:
+            if hand is None:
+                hand = self._create_hand(source, reuse_buffers)
+            self._set_hand(hand)
+
+    def _create_hand(self, source, reuse_buffers):
+        with self.startup.measure("导入 hand / cv2"):
+            import hand as hd
+
+        # 本机运行过 calibration.py 时使用保存的分辨率、缩放和模型复杂度
+        vision = load_profile() if source is None else {}
+        if vision:
+            print(f"使用校准配置: {vision}")
+
+        start = time.perf_counter()
+        hand = hd.HandBind(
             camera_id=0,
             handdraw=True,
             draw_fps=True,
             draw_index=False,
             verbose=False,
             max_hands=1,
+            threaded_capture=True,
+            landmark_format="numpy",
+            source=source,
+            profile=True,
+            fourcc="MJPG",
+            capture_buffer_size=1,
+            reuse_buffers=reuse_buffers,
+            smoothing=True,
+            predict_latency="auto",
+            gestures=True,
+            pinch_threshold=20,
+            **vision,
         )
+        self.startup.add("HandBind", time.perf_counter() - start, start)
+        # HandBind 内部各步骤依次执行，按顺序排开
+        for name, seconds in hand.init_times.items():
+            self.startup.add(f"  HandBind.{name}", seconds, start)
+            start += seconds
+        return hand
+
+    def _load_hand(self, source, reuse_buffers):
+        """后台线程：创建 HandBind，异常留给主线程处理"""
+        try:
+            self._loaded_hand = self._create_hand(source, reuse_buffers)
+        except Exception as e:
+            self._hand_error = e
 
-        original_size = self.hand.get_img_size()
-        self.scale_factor = scale_factor
+    def _adopt_hand(self):
+        """后台初始化完成后接管 HandBind，尚未完成时返回 False"""
+        if self._hand_loader is None or self._hand_loader.is_alive():
+            return False
+        if self._hand_error is not None:
+            raise self._hand_error
+        self._set_hand(self._loaded_hand)
+        return True
+
+    def _set_hand(self, hand):
+        self.hand = hand
+        size = tuple(self.hand.get_img_size())
+        if size != self.original_size:
+            self._setup_display(size)
+        if hasattr(self.hand, "clock"):
+            self.snake_game.set_clock(self.hand.clock)
+        self.sync_pinch_threshold()
+        if self.use_governor:
+            from governor import QualityGovernor
+
+            self.governor = QualityGovernor(self.hand, render_fps=60)
+        self.idle = IdleController(self.hand)
+
+    def _setup_display(self, size):
+        """按摄像头画面尺寸创建窗口和游戏对象"""
+        self.original_size = size
         self.winsize = (
-            int(original_size[0] * scale_factor),
-            int(original_size[1] * scale_factor),
+            int(size[0] * self.scale_factor),
+            int(size[1] * self.scale_factor),
         )
-        self.screen = pg.display.set_mode(self.winsize)
-        self.clock = pg.time.Clock()
-        self.quit = False
-
-        self.snake_game = SnakeGame(original_size[0], original_size[1], scale_factor)
+        with self.startup.measure("创建窗口"):
+            self.screen = pg.display.set_mode(self.winsize)
+        # 题目生成会发起网络请求，等摄像头画面出来之后再开始
+        with self.startup.measure("SnakeGame（字体等）"):
+            self.snake_game = SnakeGame(
+                size[0], size[1], self.scale_factor, start_questions=False
+            )
+        self._scaled_surface = None
 
-        self.game_state = "start_screen"
+    def draw_loading_screen(self):
+        """摄像头和手部模型还在初始化时，先显示开始界面"""
+        self.screen.fill((40, 40, 40))
+        self.snake_game.draw_start_screen(
+            self.screen, None, None, pg.mouse.get_pos(), False
+        )
+        text = self.snake_game.font_small.render(
+            "正在初始化摄像头和手部识别...", True, (255, 255, 255)
+        )
+        self.screen.blit(text, (10, self.winsize[1] - text.get_height() - 10))
+        pg.display.flip()
+        self.startup.milestone("首帧（开始界面）")
         self.mouse_clicked = False
+        self.clock.tick(30)
 
     def loop(self):
+        frame_start = time.perf_counter()
+        input_event = False
         for event in pg.event.get():
             if event.type == pg.QUIT:
                 self.quit = True
                 return
             elif event.type == pg.KEYDOWN:
+                input_event = True
                 self.handle_keyboard(event)
             elif event.type == pg.MOUSEBUTTONDOWN:
+                input_event = True
                 if event.button == 1:  # 左键点击
                     self.mouse_clicked = True
+            elif event.type == pg.MOUSEMOTION:
+                input_event = True
+
+        if self.hand is None and not self._adopt_hand():
+            self.draw_loading_screen()
+            return
+
+        # 空闲时没有新画面也没有输入就不重绘，只低频轮询
+        if self.idle.idle and not input_event and not self.idle.has_new_frame():
+            self.clock.tick(self.idle.poll_fps)
+            return
 
         success, processed_img, landmarks = self.hand.process_frame()
 
         if success:
-            frame_surface = self.cv2_to_pygame(cv2.flip(processed_img, 1))
+            import cv2
 
-            if self.scale_factor != 1.0:
-                frame_surface = pg.transform.scale(frame_surface, self.winsize)
+            if self.reuse_buffers:
+                frame_surface = self.frame_to_surface(processed_img)
+            else:
+                frame_surface = self.cv2_to_pygame(cv2.flip(processed_img, 1))
+
+                if self.scale_factor != 1.0:
+                    frame_surface = pg.transform.scale(frame_surface, self.winsize)
 
             self.screen.blit(frame_surface, (0, 0))
 
             index_pos, thumb_pos = self.get_finger_positions(landmarks)
+            # 只有开启了手势引擎的 hand 才改用引擎的捏合结果
+            if getattr(self.hand, "gestures", None) is not None:
+                self.snake_game.apply_gestures(
+                    self.hand.poll_events(), self.hand.pinching()
+                )
 
             mouse_pos = pg.mouse.get_pos()
             mouse_click = getattr(self, "mouse_clicked", False)
@@ -1049,33 +1297,81 @@ class Game:
             self.handle_game_states(index_pos, thumb_pos, mouse_pos, mouse_click)
 
             pg.display.flip()
-            self.clock.tick(60)
+            if self.startup.milestone("首帧（摄像头画面）"):
+                print(self.startup.report())
+                self.snake_game.question_manager.start_question_generation()
+
+            if self.idle.update(
+                len(landmarks) > 0,
+                input_event,
+                self.game_state,
+                self.snake_game.last_finger_pos is not None,
+            ):
+                self.clock.tick(self.idle.poll_fps)
+                return
+
+            render_fps = 60
+            if self.governor is not None:
+                self.governor.record(time.perf_counter() - frame_start)
+                render_fps = self.governor.render_fps
+            if self.game_state in MENU_STATES:
+                # 菜单界面只有光标在动，不需要满帧率
+                render_fps = min(render_fps, MENU_FPS)
+            self.clock.tick(render_fps)
 
     def cv2_to_pygame(self, cv2_img):
         """将OpenCV图像转换为Pygame表面"""
+        import cv2
+
         rgb_img = cv2.cvtColor(cv2_img, cv2.COLOR_BGR2RGB)
         rotated_img = cv2.transpose(rgb_img)
         return pg.surfarray.make_surface(rotated_img)
 
+    def frame_to_surface(self, img):
+        """镜像并转换画面，写入常驻的缓冲区和 Surface，画面尺寸不变时不重建"""
+        import cv2
+
+        height, width = img.shape[:2]
+        mirrored = cv2.flip(img, 1, dst=self.pool.get("mirror", img.shape))
+        rgb = self.pool.get("rgb", img.shape)
+        cv2.cvtColor(mirrored, cv2.COLOR_BGR2RGB, dst=rgb)
+
+        # Surface 直接引用 rgb 缓冲区，只有缓冲区重新分配时才需要重建
+        if self._surface_misses != self.pool.misses:
+            self._frame_surface = pg.image.frombuffer(rgb, (width, height), "RGB")
+            self._scaled_surface = None
+            self._surface_misses = self.pool.misses
+
+        if self.scale_factor == 1.0:
+            return self._frame_surface
+
+        if self._scaled_surface is None:
+            self._scaled_surface = pg.Surface(self.winsize, 0, self._frame_surface)
+        return pg.transform.scale(
+            self._frame_surface, self.winsize, self._scaled_surface
+        )
+
     def get_finger_positions(self, landmarks):
         """获取食指和拇指坐标"""
         index_pos = None
         thumb_pos = None
 
-        if landmarks and len(landmarks) > 0:
-            img_height, img_width = self.winsize[1], self.winsize[0]
+        if len(landmarks) > 0:
+            import hand as hd
 
-            original_index_pos = landmarks[0][8]  # 食指指尖
-            original_thumb_pos = landmarks[0][4]  # 拇指指尖
+            img_width = self.winsize[0]
+            # 回放等来源可能返回列表格式的关键点
+            landmarks = np.asarray(landmarks)
 
-            index_pos = (
-                img_width - int(original_index_pos[0] * self.scale_factor),
-                int(original_index_pos[1] * self.scale_factor),
-            )
-            thumb_pos = (
-                img_width - int(original_thumb_pos[0] * self.scale_factor),
-                int(original_thumb_pos[1] * self.scale_factor),
-            )
+            # 食指指尖(8)和拇指指尖(4)一次完成缩放；先取整再镜像，即
+            # img_width - int(x * scale)，用 float64 与 Python 浮点数结果一致
+            tips = hd.transform_landmarks(
+                landmarks[0, [8, 4], :2], scale=self.scale_factor, dtype=np.float64
+            ).astype(int)
+            tips[:, 0] = img_width - tips[:, 0]
+
+            index_pos = tuple(tips[0].tolist())
+            thumb_pos = tuple(tips[1].tolist())
 
         return index_pos, thumb_pos
 
@@ -1091,16 +1387,34 @@ class Game:
             self.game_state = "playing"
         elif event.key == pg.K_b and self.game_state == "playing":
             self.game_state = "start_screen"
+        elif event.key == pg.K_p:  # 打印视觉流水线各阶段耗时
+            if hasattr(self.hand, "get_stats"):
+                print(format_stats(self.hand.get_stats()))
+            misses = self.pool.misses
+            if getattr(self.hand, "pool", None) is not None:
+                misses += self.hand.pool.misses
+            # 只统计缓冲池中的缓冲区，池外的临时对象不在其中
+            print(f"缓冲池重建缓冲区次数: {misses}")
         elif event.key == pg.K_t:  # 调整捏合阈值
             self.snake_game.pinch_threshold += 5 * self.scale_factor
+            self.sync_pinch_threshold()
             print(f"捏合阈值调整为: {self.snake_game.pinch_threshold}")
         elif event.key == pg.K_y:  # 减小捏合阈值
             self.snake_game.pinch_threshold = max(
                 10 * self.scale_factor,
                 self.snake_game.pinch_threshold - 5 * self.scale_factor,
             )
+            self.sync_pinch_threshold()
             print(f"捏合阈值调整为: {self.snake_game.pinch_threshold}")
 
+    def sync_pinch_threshold(self):
+        """手势引擎使用摄像头像素坐标，阈值要换算回缩放前的尺寸"""
+        gestures = getattr(self.hand, "gestures", None)
+        if gestures is not None:
+            gestures.pinch_threshold = (
+                self.snake_game.pinch_threshold / self.scale_factor
+            )
+
     def handle_game_states(self, index_pos, thumb_pos, mouse_pos, mouse_click):
         """处理不同的游戏状态"""
         if self.game_state == "start_screen":
@@ -1168,7 +1482,7 @@ def main():
     # 设置放大系数
     scale_factor = 1.0
 
-    game = Game(scale_factor=scale_factor)
+    game = Game(scale_factor=scale_factor, lazy_start=True)
 
     print("贪吃蛇游戏说明:")
     print("- 移动食指来控制蛇头")
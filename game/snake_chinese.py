@@ -9,6 +9,13 @@ import numpy as np
 from PIL import Image, ImageDraw, ImageFont
 
 import hand as hd
+from buffers import BufferPool
+from body import SnakeBody
+from calibration import load_profile
+from idle import IdleController
+from occupancy import OccupancyMap
+from spatial import SnakeBodyIndex, SpatialHash
+from stats import format_stats
 
 mouse_position = (0, 0)
 mouse_clicked = False
@@ -325,6 +332,9 @@ class Obstacle:
         self.height = height
         self.type = obstacle_type
         self.color = (100, 100, 255)  # 蓝色障碍物
+        # 圆形障碍物的圆心和半径，避免每次判断时重新计算
+        self.center = (x + width // 2, y + height // 2)
+        self.radius = min(width, height) // 2
 
     def contains_point(self, point):
         """检查点是否在障碍物内"""
@@ -335,10 +345,8 @@ class Obstacle:
                 and self.y <= y <= self.y + self.height
             )
         elif self.type == "circle":
-            center_x = self.x + self.width // 2
-            center_y = self.y + self.height // 2
-            radius = min(self.width, self.height) // 2
-            return ((x - center_x) ** 2 + (y - center_y) ** 2) <= radius**2
+            center_x, center_y = self.center
+            return ((x - center_x) ** 2 + (y - center_y) ** 2) <= self.radius**2
         return False
 
     def draw(self, img):
@@ -359,14 +367,12 @@ class Obstacle:
                 2,
             )
         elif self.type == "circle":
-            center = (self.x + self.width // 2, self.y + self.height // 2)
-            radius = min(self.width, self.height) // 2
-            cv2.circle(img, center, radius, self.color, -1)
-            cv2.circle(img, center, radius, (255, 255, 255), 2)
+            cv2.circle(img, self.center, self.radius, self.color, -1)
+            cv2.circle(img, self.center, self.radius, (255, 255, 255), 2)
 
 
 class SnakeGame:
-    def __init__(self, width=640, height=480):
+    def __init__(self, width=640, height=480, occupancy_cell=1):
         self.width = width
         self.height = height
         self.max_speed = 8  # 最大移动速度（像素/帧）
@@ -377,15 +383,30 @@ class SnakeGame:
         self.pinch_threshold = 20  # 捏合检测阈值
         self.pinch_cooldown = 0.5  # 捏合冷却时间（秒）
         self.last_pinch_time = 0  # 上次捏合时间
+        self.gesture_mode = False  # 是否使用手势引擎的结果
+        self.pinch_clicked = False  # 本帧手势引擎是否产生了捏合点击
         self.obstacles = []  # 障碍物列表
+        self.grid = SpatialHash(40)  # 障碍物、蛇身和食物的空间索引
+        self.body_index = SnakeBodyIndex(self.grid)
+        self.snake_pos = SnakeBody(dtype=np.int32)  # cv2 绘制需要整数坐标
+        # 每关的障碍物和屏幕边缘占用图
+        self.occupancy = OccupancyMap(width, height, occupancy_cell)
+        self._food_pos = None
         self.current_level = 1  # 当前关卡
         self.max_level = 10  # 最大关卡数
         self.max_revive_chances = 3  # 最大复活次数
         self.reset_game()
 
     def reset_game(self):
+        # 画面尺寸改变后（例如改成摄像头分辨率）按新尺寸重建占用图
+        if (self.occupancy.width, self.occupancy.height) != (self.width, self.height):
+            self.occupancy = OccupancyMap(
+                self.width, self.height, self.occupancy.cell_size
+            )
+
         # 蛇的初始位置和长度
-        self.snake_pos = [(self.width // 2, self.height // 2)]
+        self.snake_pos.reset([(self.width // 2, self.height // 2)])
+        self.body_index.reset(self.snake_pos)
         self.snake_length = 3  # 初始长度设为3，让游戏更容易开始
 
         # 生成第一个食物
@@ -405,9 +426,33 @@ class SnakeGame:
         self.revive_question = None
         self.showing_revive_question = False
 
+    @property
+    def food_pos(self):
+        return self._food_pos
+
+    @food_pos.setter
+    def food_pos(self, pos):
+        self._food_pos = pos
+        self.grid.insert(("food", 0), pos[0], pos[1])
+
+    def add_obstacle(self, obstacle):
+        """加入障碍物并登记到空间索引和占用图"""
+        self.obstacles.append(obstacle)
+        self.occupancy.add_obstacle(obstacle)
+        self.grid.insert(
+            ("obstacle", obstacle),
+            obstacle.x,
+            obstacle.y,
+            obstacle.x + obstacle.width,
+            obstacle.y + obstacle.height,
+        )
+
     def generate_obstacles(self):
         """根据当前关卡生成障碍物"""
         self.obstacles = []
+        self.grid.remove_kind("obstacle")
+        self.occupancy.clear()
+        self.occupancy.add_margin(5)
 
         # 基础障碍物数量随关卡增加
         base_count = 2 + self.current_level
@@ -430,22 +475,27 @@ class SnakeGame:
 
             obstacle = Obstacle(x, y, width, height, obstacle_type)
 
-            # 确保障碍物不与蛇的初始位置和食物重叠
+            # 确保障碍物不与蛇的初始位置和食物重叠，只检查障碍物范围内的节点
+            nearby = self.grid.query_rect(x, y, x + width, y + height)
             if not any(
-                obstacle.contains_point(pos) for pos in self.snake_pos
-            ) and not obstacle.contains_point(self.food_pos):
-                self.obstacles.append(obstacle)
+                obstacle.contains_point(self.snake_pos[index])
+                for kind, index in self.body_index.indices(nearby)
+                if kind == "node"
+            ) and not (
+                ("food", 0) in nearby and obstacle.contains_point(self.food_pos)
+            ):
+                self.add_obstacle(obstacle)
 
         # 在高关卡添加特殊障碍物模式
         if self.current_level >= 5:
             # 添加边界障碍物
             border_width = 10
-            self.obstacles.append(Obstacle(0, 0, self.width, border_width))
-            self.obstacles.append(Obstacle(0, 0, border_width, self.height))
-            self.obstacles.append(
+            self.add_obstacle(Obstacle(0, 0, self.width, border_width))
+            self.add_obstacle(Obstacle(0, 0, border_width, self.height))
+            self.add_obstacle(
                 Obstacle(0, self.height - border_width, self.width, border_width)
             )
-            self.obstacles.append(
+            self.add_obstacle(
                 Obstacle(self.width - border_width, 0, border_width, self.height)
             )
 
@@ -453,7 +503,7 @@ class SnakeGame:
             # 添加十字形障碍物
             center_x, center_y = self.width // 2, self.height // 2
             cross_width, cross_height = 20, 100
-            self.obstacles.append(
+            self.add_obstacle(
                 Obstacle(
                     center_x - cross_width // 2,
                     center_y - cross_height // 2,
@@ -461,7 +511,7 @@ class SnakeGame:
                     cross_height,
                 )
             )
-            self.obstacles.append(
+            self.add_obstacle(
                 Obstacle(
                     center_x - cross_height // 2,
                     center_y - cross_width // 2,
@@ -472,23 +522,35 @@ class SnakeGame:
 
     def generate_food(self):
         """在随机位置生成食物，确保不在蛇身上和障碍物上"""
-        while True:
-            food_pos = (
-                random.randint(50, self.width - 50),
-                random.randint(50, self.height - 50),
-            )
-            # 检查食物是否与蛇身重叠
-            if all(
-                self.distance(food_pos, pos) > 40 for pos in self.snake_pos
-            ) and not any(obs.contains_point(food_pos) for obs in self.obstacles):
-                return food_pos
+        # 直接从空闲格子中均匀取样，画面被占满时也不会一直重试
+        food_pos = self.occupancy.sample_free(
+            50,
+            50,
+            self.width - 50,
+            self.height - 50,
+            avoid=self.snake_pos.array,
+            radius=40,
+        )
+        if food_pos is None:
+            return (self.width // 4, self.height // 4)
+        return (int(food_pos[0]), int(food_pos[1]))  # cv2 绘制需要整数坐标
 
     def distance(self, pos1, pos2):
         """计算两点之间的欧几里得距离"""
         return ((pos1[0] - pos2[0]) ** 2 + (pos1[1] - pos2[1]) ** 2) ** 0.5
 
+    def apply_gestures(self, events):
+        """记录手势引擎本帧的捏合点击"""
+        self.gesture_mode = True
+        self.pinch_clicked = any(event.kind == "pinch" for event in events)
+
     def is_pinch_gesture(self, index_pos, thumb_pos):
         """检测食指和拇指是否捏合"""
+        if self.gesture_mode:
+            # 每帧的点击只被第一个界面消费一次
+            clicked, self.pinch_clicked = self.pinch_clicked, False
+            return clicked and index_pos is not None
+
         if index_pos is None or thumb_pos is None:
             return False
 
@@ -566,7 +628,8 @@ class SnakeGame:
         new_head = (new_x, new_y)
 
         # 更新蛇头位置
-        self.snake_pos.insert(0, new_head)
+        self.snake_pos.push_head(new_head)
+        self.body_index.push_head(new_head)
 
         # 检查是否吃到食物
         ate_food = False
@@ -590,33 +653,27 @@ class SnakeGame:
 
         # 保持蛇身长度（如果没吃到食物，移除尾部）
         if not ate_food and len(self.snake_pos) > self.snake_length:
-            self.snake_pos.pop()
+            self.snake_pos.pop_tail()
+            self.body_index.pop_tail()
 
-        # 检查游戏结束条件（撞墙）
-        x, y = new_head
-        if x < 5 or x > self.width - 5 or y < 5 or y > self.height - 5:
+        # 检查游戏结束条件（撞墙或撞到障碍物），占用图中包含两者
+        if self.occupancy.blocked_at(new_head):
             self.handle_game_over()
             return
 
         # 检查游戏结束条件（撞到自己）
         # 使用更智能的碰撞检测，只检查距离足够远的身体部分
         if not ate_food:
-            for i, pos in enumerate(self.snake_pos):
+            for kind, i in self.body_index.nearby(new_head, 15):
                 # 跳过头部本身和前几个靠近头部的节点
-                if i < 5:  # 跳过前5个节点，包括头部
+                if kind != "node" or i < 5:  # 跳过前5个节点，包括头部
                     continue
 
                 # 只检查距离头部足够远的节点
-                if self.distance(new_head, pos) < 15:
+                if self.distance(new_head, self.snake_pos[i]) < 15:
                     self.handle_game_over()
                     return
 
-        # 检查游戏结束条件（撞到障碍物）
-        for obstacle in self.obstacles:
-            if obstacle.contains_point(new_head):
-                self.handle_game_over()
-                return
-
     def handle_game_over(self):
         """处理游戏结束，检查是否有复活机会"""
         if self.revive_chances > 0:
@@ -641,7 +698,8 @@ class SnakeGame:
         self.revive_question = None
 
         # 重置蛇的位置，保持当前关卡和分数
-        self.snake_pos = [(self.width // 2, self.height // 2)]
+        self.snake_pos.reset([(self.width // 2, self.height // 2)])
+        self.body_index.reset(self.snake_pos)
         self.snake_length = max(3, self.snake_length - 1)  # 复活后长度稍微减少作为惩罚
 
         # 重新生成食物
@@ -657,14 +715,15 @@ class SnakeGame:
             obstacle.draw(img)
 
         # 绘制蛇身
-        for i, pos in enumerate(self.snake_pos):
+        body = self.snake_pos.tolist()
+        for i, pos in enumerate(body):
             # 蛇头用不同颜色
             if i == 0:
                 color = (0, 255, 0)  # 蛇头亮绿色
                 radius = 15  # 增加蛇头半径
             else:
                 # 蛇身颜色渐变
-                color_ratio = i / len(self.snake_pos)
+                color_ratio = i / len(body)
                 color = (0, int(200 * (1 - color_ratio)), 0)
                 radius = 13  # 增加蛇身半径
 
@@ -673,7 +732,7 @@ class SnakeGame:
 
             # 绘制蛇身连接线（更粗的线）
             if i > 0:
-                cv2.line(img, self.snake_pos[i - 1], pos, (0, 160, 0), 10)
+                cv2.line(img, body[i - 1], pos, (0, 160, 0), 10)
 
         # 绘制食物
         cv2.circle(img, self.food_pos, 15, (0, 0, 255), -1)  # 增加食物大小
@@ -1279,11 +1338,16 @@ class SnakeGame:
         return buttons_clicked
 
 
-def test():
+def test(source=None):
     # 在函数内部声明全局变量
     global mouse_position, mouse_clicked
 
     print("初始化手部检测模块...")
+    # 本机运行过 calibration.py 时使用保存的分辨率、缩放和模型复杂度
+    vision = load_profile() if source is None else {}
+    if vision:
+        print(f"使用校准配置: {vision}")
+
     # 初始化手部检测
     try:
         hand = hd.HandBind(
@@ -1293,6 +1357,18 @@ def test():
             draw_index=False,
             verbose=False,
             max_hands=1,
+            threaded_capture=True,
+            landmark_format="numpy",
+            source=source,
+            profile=True,
+            fourcc="MJPG",
+            capture_buffer_size=1,
+            reuse_buffers=True,
+            smoothing=True,
+            predict_latency="auto",
+            gestures=True,
+            pinch_threshold=20,
+            **vision,
         )
     except Exception as e:
         print(f"手部检测初始化失败: {e}")
@@ -1338,8 +1414,24 @@ def test():
         game.user_manager.add_user("玩家3")
 
     print("开始游戏主循环...")
+    pool = BufferPool()
+    # 没有手也没有输入时降频；空闲时只在有新画面或输入时处理和重绘
+    idle = IdleController(hand)
+    last_mouse_position = mouse_position
+    key_pressed = False
 
     while True:
+        input_event = (
+            key_pressed or mouse_clicked or mouse_position != last_mouse_position
+        )
+        last_mouse_position = mouse_position
+        if idle.idle and not input_event and not idle.has_new_frame():
+            key = cv2.waitKey(1000 // idle.poll_fps) & 0xFF
+            if key == ord("q"):
+                break
+            key_pressed = key != 255
+            continue
+
         success, processed_img, landmarks = hand.process_frame()
 
         if success:
@@ -1352,21 +1444,32 @@ def test():
                 game.height = img_height
                 game.reset_game()
 
-            # 镜像画面 - 水平翻转
-            processed_img = cv2.flip(processed_img, 1)
+            # 镜像画面 - 水平翻转（写入复用的缓冲区）
+            processed_img = cv2.flip(
+                processed_img, 1, dst=pool.get("mirror", processed_img.shape)
+            )
 
             # 获取食指和拇指坐标
             index_pos = None
             thumb_pos = None
-            if landmarks and len(landmarks) > 0:
+            if len(landmarks) > 0:
                 # landmarks[0] 表示第一只手，[8] 表示食指指尖，[4] 表示拇指指尖
-                original_index_pos = landmarks[0][8]
-                original_thumb_pos = landmarks[0][4]
+                original_index_pos = landmarks[0, 8, :2].tolist()
+                original_thumb_pos = landmarks[0, 4, :2].tolist()
 
                 # 镜像手指坐标（因为画面已经水平翻转）
                 index_pos = (img_width - original_index_pos[0], original_index_pos[1])
                 thumb_pos = (img_width - original_thumb_pos[0], original_thumb_pos[1])
 
+            # 捏合由手势引擎每帧识别一次
+            game.apply_gestures(hand.poll_events())
+            idle.update(
+                index_pos is not None,
+                input_event,
+                game_state,
+                game.last_finger_pos is not None,
+            )
+
             # 重置鼠标点击状态（每次循环只处理一次点击）
             current_mouse_click = mouse_clicked
             mouse_clicked = False
@@ -1540,6 +1643,7 @@ def test():
 
             # 键盘控制
             key = cv2.waitKey(1) & 0xFF
+            key_pressed = key != 255
             if key == ord("q"):
                 break
             elif key == ord("r") and game_state == "game_over":
@@ -1550,9 +1654,11 @@ def test():
                 game_state = "playing"
             elif key == ord("t"):  # 临时按键：调整捏合阈值
                 game.pinch_threshold += 5
+                hand.gestures.pinch_threshold = game.pinch_threshold
                 print(f"捏合阈值调整为: {game.pinch_threshold}")
             elif key == ord("y"):  # 临时按键：减小捏合阈值
                 game.pinch_threshold = max(10, game.pinch_threshold - 5)
+                hand.gestures.pinch_threshold = game.pinch_threshold
                 print(f"捏合阈值调整为: {game.pinch_threshold}")
             elif key == ord("b") and game_state == "playing":  # 返回开始画面
                 game_state = "start_screen"
@@ -1562,6 +1668,9 @@ def test():
                     game.generate_obstacles()
                     print(f"跳到第 {game.current_level} 关")
 
+    # 打印视觉流水线各阶段耗时，便于排查卡顿
+    print(format_stats(hand.get_stats()))
+
     # 释放资源
     hand.release()
     cv2.destroyAllWindows()
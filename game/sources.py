@@ -0,0 +1,310 @@
+"""帧来源：摄像头之外的视频文件、图片目录和合成画面
+
+这些类的接口与 cv2.VideoCapture 一致（read / get / set / isOpened / release），
+可以直接交给 HandBind 或 ThreadedCapture 使用。
+"""
+
+import os
+import time
+
+import cv2
+import numpy as np
+
+IMAGE_EXTENSIONS = (".png", ".jpg", ".jpeg", ".bmp")
+
+
+class FrameSource:
+    """帧来源基类，realtime=True 时按 fps 节奏出帧，否则尽可能快地出帧"""
+
+    def __init__(self, fps: float = 30.0, realtime: bool = True, loop: bool = False):
+        self.fps = fps
+        self.realtime = realtime
+        self.loop = loop
+        self.width = 0
+        self.height = 0
+        self.frame_count = -1  # 未知或无限时为 -1
+        self.position = 0
+        self._opened = True
+        self._next_time = None
+
+    def _next_frame(self, image):
+        raise NotImplementedError
+
+    def _rewind(self) -> bool:
+        return False
+
+    def read(self, image=None):
+        if not self._opened:
+            return False, None
+
+        if self.realtime and self.fps > 0:
+            now = time.perf_counter()
+            if self._next_time is None:
+                self._next_time = now
+            elif now < self._next_time:
+                time.sleep(self._next_time - now)
+            # 落后太多时不追帧，从当前时间重新计时
+            self._next_time = max(self._next_time, now - 1.0 / self.fps) + 1.0 / self.fps
+
+        ret, img = self._next_frame(image)
+        if not ret and self.loop and self._rewind():
+            ret, img = self._next_frame(image)
+        if ret:
+            self.position += 1
+        else:
+            # 文件读完后视为已关闭，采集线程据此立即结束
+            self._opened = False
+        return ret, img
+
+    def get(self, prop_id):
+        if prop_id == cv2.CAP_PROP_FRAME_WIDTH:
+            return float(self.width)
+        if prop_id == cv2.CAP_PROP_FRAME_HEIGHT:
+            return float(self.height)
+        if prop_id == cv2.CAP_PROP_FPS:
+            return float(self.fps)
+        if prop_id == cv2.CAP_PROP_FRAME_COUNT:
+            return float(self.frame_count)
+        if prop_id == cv2.CAP_PROP_POS_FRAMES:
+            return float(self.position)
+        return 0.0
+
+    def set(self, prop_id, value) -> bool:
+        if prop_id == cv2.CAP_PROP_FPS and value > 0:
+            self.fps = float(value)
+            return True
+        return False
+
+    def isOpened(self) -> bool:
+        return self._opened
+
+    def release(self):
+        self._opened = False
+
+
+def _store(image, img):
+    """尽量把读到的画面写进调用方提供的缓冲区"""
+    if image is not None and image.shape == img.shape and image.dtype == img.dtype:
+        np.copyto(image, img)
+        return image
+    return img
+
+
+class VideoFileSource(FrameSource):
+    """从视频文件读取画面，fps 默认取文件自身的帧率"""
+
+    def __init__(self, path: str, realtime: bool = True, loop: bool = False, fps=None):
+        self.cap = cv2.VideoCapture(path)
+        super().__init__(
+            fps=fps or self.cap.get(cv2.CAP_PROP_FPS) or 30.0,
+            realtime=realtime,
+            loop=loop,
+        )
+        self._opened = self.cap.isOpened()
+        self.width = int(self.cap.get(cv2.CAP_PROP_FRAME_WIDTH))
+        self.height = int(self.cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
+        self.frame_count = int(self.cap.get(cv2.CAP_PROP_FRAME_COUNT))
+
+    def _next_frame(self, image):
+        if image is None:
+            return self.cap.read()
+        return self.cap.read(image)
+
+    def _rewind(self) -> bool:
+        self.position = 0
+        return self.cap.set(cv2.CAP_PROP_POS_FRAMES, 0)
+
+    def release(self):
+        super().release()
+        self.cap.release()
+
+
+class ImageDirSource(FrameSource):
+    """按文件名顺序读取目录中的图片"""
+
+    def __init__(self, path: str, fps: float = 30.0, realtime: bool = True, loop=False):
+        super().__init__(fps=fps, realtime=realtime, loop=loop)
+        self.files = sorted(
+            os.path.join(path, name)
+            for name in os.listdir(path)
+            if name.lower().endswith(IMAGE_EXTENSIONS)
+        )
+        self.frame_count = len(self.files)
+        self._opened = bool(self.files)
+        self._index = 0
+
+        if self.files:
+            first = cv2.imread(self.files[0])
+            self._opened = first is not None
+            if first is not None:
+                self.height, self.width = first.shape[:2]
+
+    def _next_frame(self, image):
+        if self._index >= len(self.files):
+            return False, None
+        img = cv2.imread(self.files[self._index])
+        self._index += 1
+        if img is None:
+            return False, None
+        return True, _store(image, img)
+
+    def _rewind(self) -> bool:
+        self._index = 0
+        self.position = 0
+        return True
+
+
+class SyntheticSource(FrameSource):
+    """生成可复现的合成画面：渐变背景上绕圈移动的肤色圆块
+
+    画面里没有真实的手，MediaPipe 不会检测到关键点，适合在没有摄像头的
+    机器上测量采集、推理和渲染的开销。frames 为 None 时无限出帧。
+    """
+
+    def __init__(
+        self,
+        width: int = 640,
+        height: int = 480,
+        fps: float = 30.0,
+        realtime: bool = True,
+        frames=None,
+    ):
+        super().__init__(fps=fps, realtime=realtime)
+        self.width = width
+        self.height = height
+        self.frames = frames
+        self.frame_count = -1 if frames is None else frames
+
+        ramp = np.linspace(40, 120, width, dtype=np.uint8)
+        self._background = np.empty((height, width, 3), np.uint8)
+        self._background[:] = ramp[None, :, None]
+        self._frame = np.empty_like(self._background)
+
+    def _next_frame(self, image):
+        if self.frames is not None and self.position >= self.frames:
+            return False, None
+
+        img = image
+        if img is None or img.shape != self._background.shape:
+            img = self._frame
+        np.copyto(img, self._background)
+
+        angle = self.position * 2 * np.pi / 90
+        center = (
+            int(self.width / 2 + self.width / 4 * np.cos(angle)),
+            int(self.height / 2 + self.height / 4 * np.sin(angle)),
+        )
+        cv2.circle(img, center, min(self.width, self.height) // 8, (120, 160, 220), -1)
+        return True, img
+
+
+def open_source(spec, realtime: bool = True, loop: bool = False):
+    """根据描述打开帧来源
+
+    - int：摄像头编号
+    - "synthetic" 或 "synthetic:640x480"：合成画面
+    - 目录：图片序列
+    - 其他字符串：视频文件
+    """
+    if isinstance(spec, int):
+        return cv2.VideoCapture(spec)
+
+    if spec.startswith("synthetic"):
+        _, _, size = spec.partition(":")
+        width, height = (int(v) for v in size.split("x")) if size else (640, 480)
+        return SyntheticSource(width, height, realtime=realtime)
+
+    if os.path.isdir(spec):
+        return ImageDirSource(spec, realtime=realtime, loop=loop)
+
+    return VideoFileSource(spec, realtime=realtime, loop=loop)
+
+
+# 自动协商时依次尝试的采集模式：(FOURCC, 宽, 高, 帧率)
+CAPTURE_MODES = [
+    ("MJPG", 1280, 720, 30),
+    ("MJPG", 640, 480, 30),
+    ("YUYV", 640, 480, 30),
+]
+
+
+def fourcc_to_str(value) -> str:
+    code = int(value)
+    if code <= 0:
+        return ""
+    return "".join(chr((code >> (8 * i)) & 0xFF) for i in range(4))
+
+
+def read_capture_mode(cap) -> dict:
+    """读取驱动实际采用的采集参数"""
+    return {
+        "width": int(cap.get(cv2.CAP_PROP_FRAME_WIDTH)),
+        "height": int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT)),
+        "fps": cap.get(cv2.CAP_PROP_FPS),
+        "fourcc": fourcc_to_str(cap.get(cv2.CAP_PROP_FOURCC)),
+        "buffer_size": int(cap.get(cv2.CAP_PROP_BUFFERSIZE)),
+    }
+
+
+def apply_capture_mode(
+    cap, width=None, height=None, fps=None, fourcc=None, buffer_size=None
+) -> dict:
+    """设置采集参数并返回驱动实际接受的结果
+
+    FOURCC 要先于分辨率设置，否则部分 UVC 驱动会按旧格式挑选分辨率。
+    """
+    if fourcc:
+        cap.set(cv2.CAP_PROP_FOURCC, cv2.VideoWriter_fourcc(*fourcc))
+    if width:
+        cap.set(cv2.CAP_PROP_FRAME_WIDTH, width)
+    if height:
+        cap.set(cv2.CAP_PROP_FRAME_HEIGHT, height)
+    if fps:
+        cap.set(cv2.CAP_PROP_FPS, fps)
+    if buffer_size:
+        cap.set(cv2.CAP_PROP_BUFFERSIZE, buffer_size)
+    return read_capture_mode(cap)
+
+
+def measure_fps(cap, frames: int = 10, warmup: int = 2) -> float:
+    """实际读取若干帧测量帧率，驱动报告的帧率往往并不可靠"""
+    for _ in range(warmup):
+        cap.read()
+    start = time.perf_counter()
+    for i in range(frames):
+        ret, _ = cap.read()
+        if not ret:
+            frames = i
+            break
+    elapsed = time.perf_counter() - start
+    return frames / elapsed if frames and elapsed > 0 else 0.0
+
+
+def negotiate_capture(
+    cap, modes=CAPTURE_MODES, buffer_size: int = 1, min_fps_ratio: float = 0.8
+) -> dict:
+    """依次尝试 modes，返回第一个被驱动接受且实测帧率达标的模式
+
+    都不达标时退回实测帧率最高的模式。返回值额外包含 measured_fps。
+    """
+    best = None
+    for fourcc, width, height, fps in modes:
+        mode = apply_capture_mode(cap, width, height, fps, fourcc, buffer_size)
+        if (mode["width"], mode["height"]) != (width, height):
+            continue
+        if mode["fourcc"] and mode["fourcc"] != fourcc:
+            continue
+
+        mode["measured_fps"] = measure_fps(cap)
+        if mode["measured_fps"] >= fps * min_fps_ratio:
+            return mode
+        if best is None or mode["measured_fps"] > best[1]["measured_fps"]:
+            best = ((fourcc, width, height, fps), mode)
+
+    if best is None:
+        return read_capture_mode(cap)
+
+    fourcc, width, height, fps = best[0]
+    mode = apply_capture_mode(cap, width, height, fps, fourcc, buffer_size)
+    mode["measured_fps"] = best[1]["measured_fps"]
+    return mode
@@ -0,0 +1,184 @@
+"""均匀网格空间哈希
+
+把画面划分成边长 cell_size 的格子，每个物体按包围盒登记到覆盖的所有格子。
+查询时只取查询范围覆盖的格子里的物体作为候选，再由调用方做精确判断，
+这样每次查询的开销只和附近的物体数量有关，与障碍物总数、蛇身长度无关。
+
+登记的键约定为 (类别, 标识) 元组，例如 ("obstacle", 障碍物对象)、
+("node", 序号)、("segment", 序号)、("food", 0)，查询时可按类别过滤。
+"""
+
+import math
+from collections import defaultdict
+
+
+class SpatialHash:
+    """均匀网格，支持增量插入、删除和点、线段、圆形范围查询"""
+
+    def __init__(self, cell_size: float):
+        if cell_size <= 0:
+            raise ValueError("cell_size 必须大于 0")
+        self.cell_size = cell_size
+        self._cells = defaultdict(set)  # (列, 行) -> 键集合
+        self._items = {}  # 键 -> 登记的格子范围
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def __contains__(self, key) -> bool:
+        return key in self._items
+
+    def _cell_range(self, x0, y0, x1, y1):
+        size = self.cell_size
+        return (
+            math.floor(min(x0, x1) / size),
+            math.floor(min(y0, y1) / size),
+            math.floor(max(x0, x1) / size),
+            math.floor(max(y0, y1) / size),
+        )
+
+    def insert(self, key, x0, y0, x1=None, y1=None) -> None:
+        """按包围盒登记；只给一个点时登记为点。已存在的键会先移除"""
+        if key in self._items:
+            self.remove(key)
+        if x1 is None:
+            x1, y1 = x0, y0
+        cells = self._cell_range(x0, y0, x1, y1)
+        c0, r0, c1, r1 = cells
+        for col in range(c0, c1 + 1):
+            for row in range(r0, r1 + 1):
+                self._cells[(col, row)].add(key)
+        self._items[key] = cells
+
+    def remove(self, key) -> None:
+        cells = self._items.pop(key, None)
+        if cells is None:
+            return
+        c0, r0, c1, r1 = cells
+        for col in range(c0, c1 + 1):
+            for row in range(r0, r1 + 1):
+                bucket = self._cells[(col, row)]
+                bucket.discard(key)
+                if not bucket:
+                    del self._cells[(col, row)]
+
+    def remove_kind(self, kind) -> None:
+        for key in [key for key in self._items if key[0] == kind]:
+            self.remove(key)
+
+    def clear(self) -> None:
+        self._cells.clear()
+        self._items.clear()
+
+    def _collect(self, cells, kind):
+        result = set()
+        for cell in cells:
+            bucket = self._cells.get(cell)
+            if bucket:
+                result.update(bucket)
+        if kind is not None:
+            result = {key for key in result if key[0] == kind}
+        return result
+
+    def query_rect(self, x0, y0, x1, y1, kind=None) -> set:
+        c0, r0, c1, r1 = self._cell_range(x0, y0, x1, y1)
+        cells = (
+            (col, row) for col in range(c0, c1 + 1) for row in range(r0, r1 + 1)
+        )
+        return self._collect(cells, kind)
+
+    def query_point(self, point, kind=None) -> set:
+        """包围盒可能包含该点的物体"""
+        x, y = point
+        return self._collect(
+            [(math.floor(x / self.cell_size), math.floor(y / self.cell_size))], kind
+        )
+
+    def query_radius(self, point, radius, kind=None) -> set:
+        """包围盒可能与以 point 为圆心、radius 为半径的圆相交的物体"""
+        x, y = point
+        return self.query_rect(x - radius, y - radius, x + radius, y + radius, kind)
+
+    def query_segment(self, start, end, radius=0.0, kind=None) -> set:
+        """包围盒可能与线段（向两侧扩展 radius）相交的物体
+
+        只取离线段足够近的格子，长斜线段不会退化成整个包围盒。
+        """
+        (x0, y0), (x1, y1) = start, end
+        size = self.cell_size
+        c0, r0, c1, r1 = self._cell_range(
+            x0 - radius, y0 - radius, x1 + radius, y1 + radius
+        )
+        dx, dy = x1 - x0, y1 - y0
+        length_sq = dx * dx + dy * dy
+        # 格子中心到线段的距离不超过 radius 加半条对角线时，格子才可能相交
+        reach = radius + size * math.sqrt(0.5)
+        cells = []
+        for col in range(c0, c1 + 1):
+            for row in range(r0, r1 + 1):
+                cx, cy = (col + 0.5) * size, (row + 0.5) * size
+                t = 0.0
+                if length_sq:
+                    t = max(0.0, min(1.0, ((cx - x0) * dx + (cy - y0) * dy) / length_sq))
+                px, py = x0 + t * dx, y0 + t * dy
+                if (cx - px) ** 2 + (cy - py) ** 2 <= reach * reach:
+                    cells.append((col, row))
+        return self._collect(cells, kind)
+
+
+class SnakeBodyIndex:
+    """在 SpatialHash 中增量维护蛇身的节点和线段
+
+    节点按加入顺序编号，蛇头编号最大；线段 s 连接节点 s 和 s + 1。蛇头前进
+    时只登记一个节点和一条线段，尾部缩短时只移除一个节点和一条线段。
+    """
+
+    def __init__(self, grid: SpatialHash):
+        self.grid = grid
+        self.head_seq = -1
+        self.count = 0
+        self._positions = {}  # 序号 -> 坐标
+
+    def reset(self, positions) -> None:
+        """positions 从蛇头到蛇尾"""
+        self.grid.remove_kind("node")
+        self.grid.remove_kind("segment")
+        self._positions.clear()
+        self.head_seq = -1
+        self.count = 0
+        for pos in reversed(list(positions)):
+            self.push_head(pos)
+
+    def push_head(self, pos) -> None:
+        self.head_seq += 1
+        seq = self.head_seq
+        self._positions[seq] = pos
+        self.grid.insert(("node", seq), pos[0], pos[1])
+        if self.count:
+            prev = self._positions[seq - 1]
+            self.grid.insert(("segment", seq - 1), prev[0], prev[1], pos[0], pos[1])
+        self.count += 1
+
+    def pop_tail(self) -> None:
+        if not self.count:
+            return
+        seq = self.head_seq - self.count + 1
+        del self._positions[seq]
+        self.grid.remove(("node", seq))
+        self.grid.remove(("segment", seq))
+        self.count -= 1
+
+    def indices(self, keys):
+        """把查询结果中的蛇身键换成 (类别, 下标)，蛇头下标为 0
+
+        线段的下标取靠近蛇头一端的节点下标，其他类别的键被忽略。
+        """
+        for kind, seq in keys:
+            if kind == "node":
+                yield kind, self.head_seq - seq
+            elif kind == "segment":
+                yield kind, self.head_seq - seq - 1
+
+    def nearby(self, point, radius):
+        """point 附近的节点和线段，见 indices()"""
+        return self.indices(self.grid.query_radius(point, radius))
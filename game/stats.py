@@ -0,0 +1,178 @@
+"""视觉流水线各阶段的耗时统计
+
+每个阶段一个固定大小的对数分桶直方图，记录一次只做一次对数运算和一次加法，
+可以在正式环境中一直开着。StartupTimer 另外记录启动过程中各组件的耗时。
+"""
+
+import math
+import threading
+import time
+from contextlib import contextmanager
+
+
+class LatencyHistogram:
+    """对数分桶的耗时直方图，单位为秒，相对误差约为 ratio - 1"""
+
+    def __init__(self, min_value: float = 1e-6, max_value: float = 10.0, ratio=1.05):
+        self.min_value = min_value
+        self.ratio = ratio
+        self._log_ratio = math.log(ratio)
+        self.bins = [0] * (int(math.log(max_value / min_value) / self._log_ratio) + 2)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def record(self, value: float) -> None:
+        if value > self.min_value:
+            index = int(math.log(value / self.min_value) / self._log_ratio) + 1
+            index = min(index, len(self.bins) - 1)
+        else:
+            index = 0
+        self.bins[index] += 1
+        self.count += 1
+        self.total += value
+        if value > self.max:
+            self.max = value
+
+    def percentile(self, q: float) -> float:
+        """返回第 q 百分位所在分桶的上界"""
+        if not self.count:
+            return 0.0
+        target = q / 100 * self.count
+        seen = 0
+        for index, n in enumerate(self.bins):
+            seen += n
+            if seen >= target:
+                return min(self.min_value * self.ratio**index, self.max)
+        return self.max
+
+    def reset(self) -> None:
+        self.bins = [0] * len(self.bins)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+
+class StageTimer:
+    """按阶段累计耗时：start() 开始一帧，lap(stage) 记录距上一个时间点的耗时"""
+
+    def __init__(self):
+        self.histograms: dict[str, LatencyHistogram] = {}
+        self._frame_start = 0.0
+        self._last = 0.0
+
+    def start(self) -> None:
+        self._frame_start = self._last = time.perf_counter()
+
+    def lap(self, stage: str) -> None:
+        now = time.perf_counter()
+        self._record(stage, now - self._last)
+        self._last = now
+
+    def skip(self) -> None:
+        """不计入任何阶段，只移动时间点"""
+        self._last = time.perf_counter()
+
+    def finish(self, stage: str = "total") -> None:
+        self._record(stage, time.perf_counter() - self._frame_start)
+
+    def _record(self, stage: str, value: float) -> None:
+        histogram = self.histograms.get(stage)
+        if histogram is None:
+            histogram = self.histograms[stage] = LatencyHistogram()
+        histogram.record(value)
+
+    def stats(self) -> dict[str, dict[str, float]]:
+        """各阶段的次数、平均值、p50/p95/p99 和最大值，单位毫秒"""
+        result = {}
+        for stage, histogram in self.histograms.items():
+            if not histogram.count:
+                continue
+            result[stage] = {
+                "count": histogram.count,
+                "mean": histogram.total / histogram.count * 1000,
+                "p50": histogram.percentile(50) * 1000,
+                "p95": histogram.percentile(95) * 1000,
+                "p99": histogram.percentile(99) * 1000,
+                "max": histogram.max * 1000,
+            }
+        return result
+
+    def reset(self) -> None:
+        for histogram in self.histograms.values():
+            histogram.reset()
+
+
+def format_stats(stats: dict[str, dict[str, float]]) -> str:
+    """把 stats() 的结果排成表格，便于打印"""
+    # 中文表头每个字占两列，宽度相应减少
+    lines = [
+        f"{'阶段':<10}{'次数':>6}{'平均':>7}{'p50':>9}{'p95':>9}{'p99':>9}{'最大':>7}"
+    ]
+    for stage, s in stats.items():
+        lines.append(
+            f"{stage:<12}{s['count']:>8}{s['mean']:>9.2f}{s['p50']:>9.2f}"
+            f"{s['p95']:>9.2f}{s['p99']:>9.2f}{s['max']:>9.2f}"
+        )
+    return "\n".join(lines)
+
+
+class StartupTimer:
+    """启动耗时：各组件的起止时间，以及首帧等里程碑距启动的时间
+
+    组件可能在后台线程中初始化，记录时加锁；时间都相对 origin（默认为创建时刻）。
+    """
+
+    def __init__(self, origin: float | None = None):
+        self.origin = time.perf_counter() if origin is None else origin
+        self.components: list[tuple[str, float, float, str]] = []
+        self.milestones: dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def measure(self, name: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(name, time.perf_counter() - start, start)
+
+    def add(self, name: str, seconds: float, start: float | None = None) -> None:
+        if start is None:
+            start = time.perf_counter() - seconds
+        with self._lock:
+            self.components.append(
+                (name, start - self.origin, seconds, threading.current_thread().name)
+            )
+
+    def milestone(self, name: str) -> bool:
+        """记录里程碑，同名的只记第一次；首次记录时返回 True"""
+        with self._lock:
+            if name in self.milestones:
+                return False
+            self.milestones[name] = time.perf_counter() - self.origin
+            return True
+
+    def report(self) -> str:
+        """按开始时间排列的组件耗时表，后面附上各里程碑，单位毫秒"""
+        with self._lock:
+            components = sorted(self.components, key=lambda c: c[1])
+            milestones = sorted(self.milestones.items(), key=lambda m: m[1])
+        width = max([_display_width(c[0]) for c in components] + [8]) + 2
+        lines = [_pad("组件", width) + f"{'开始':>6}{'耗时':>8}  线程"]
+        for name, start, seconds, thread in components:
+            lines.append(
+                _pad(name, width) + f"{start * 1000:>8.0f}{seconds * 1000:>10.0f}  {thread}"
+            )
+        for name, at in milestones:
+            lines.append(_pad(name, width) + f"{at * 1000:>8.0f}")
+        return "\n".join(lines)
+
+
+def _display_width(text: str) -> int:
+    """终端显示宽度，中文等全角字符占两列"""
+    return sum(2 if ord(ch) > 0x2E7F else 1 for ch in text)
+
+
+def _pad(text: str, width: int) -> str:
+    return text + " " * (width - _display_width(text))